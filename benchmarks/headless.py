@@ -0,0 +1,110 @@
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+# Runs the game's simulation without drawing anything, as fast as it can, to soak test levels
+# and measure how many steps of the game can be simulated per second
+#
+#   python benchmarks/headless.py --ticks 20000
+#   python benchmarks/headless.py assets/levels/2.txt --ticks 100000 --seed 3
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pygame
+
+pygame.display.init()
+pygame.mixer.init()
+pygame.display.set_mode((832, 640))
+
+from user.player import Player
+from world.level import Levels
+from world.tiles import TILE_SIZE
+from world.level_objects import Lava
+
+# Length of each step of the game, in seconds
+STEP = 1 / 60
+
+# Keys held down by the simulated player, one set is picked at random every HOLD steps
+INPUTS = [set(), {pygame.K_d}, {pygame.K_a}, {pygame.K_d, pygame.K_SPACE}, {pygame.K_a, pygame.K_SPACE}]
+HOLD = 45
+
+
+# Stands in for the list returned by pygame.key.get_pressed
+class Keys:
+
+    def __init__(self, pressed):
+        self.pressed = pressed
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+# Handle the events the game posts which change the simulation, like the player taking damage
+def process_events(player):
+    for event in pygame.event.get():
+        if event.type == Lava.BURN:
+            player.change_hp(-1)
+        player.process_event(event)
+
+
+# Simulate a level for a number of steps, restarting it whenever the player dies
+# Returns the number of steps per second and what happened to the level while it was simulated
+def soak(path, ticks, seed):
+    randomiser = random.Random(seed)
+    player = Player()
+    pygame.player = player
+    levels = Levels([(os.path.basename(path), path)], player)
+    level = levels.current
+    pygame.level = level
+    deaths = 0
+    keys = Keys(set())
+
+    started = time.perf_counter()
+    for tick in range(ticks):
+        if tick % HOLD == 0:
+            keys = Keys(randomiser.choice(INPUTS))
+        player.update(STEP, keys, level)
+        level.update(STEP)
+        process_events(player)
+        if player.HEALTH <= 0:
+            deaths += 1
+            player.reset()
+            levels.reset()
+    elapsed = time.perf_counter() - started
+
+    # Anything below the bottom of the level has fallen through the floor
+    floor = level.rows * TILE_SIZE
+    fallen = [entity for entity in level.level_npc + level.level_objects + [player] if entity.rect.y > floor]
+    return {'ticks_per_second': ticks / elapsed, 'deaths': deaths, 'npcs': len(level.level_npc),
+            'objects': len(level.level_objects), 'bullets': len(level.level_bullets), 'fallen': len(fallen)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate levels without drawing them.')
+    parser.add_argument('levels', nargs='*', help='level files to simulate, every level in the game by default')
+    parser.add_argument('--ticks', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    paths = args.levels or sorted(glob.glob(os.path.join('assets', 'levels', '*.txt')))
+    failed = False
+    for path in paths:
+        result = soak(path, args.ticks, args.seed)
+        failed = failed or result['fallen'] > 0
+        print(f"{path}: {result['ticks_per_second']:9.0f} ticks/s   deaths {result['deaths']:3}   "
+              f"npcs {result['npcs']:3}   objects {result['objects']:4}   bullets {result['bullets']:2}   "
+              f"fallen {result['fallen']}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
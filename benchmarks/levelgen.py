@@ -0,0 +1,86 @@
+import argparse
+import math
+import os
+import random
+
+# Generates synthetic level files in the same format as the levels in assets/levels, for benchmarking
+# The geometry of a template level is repeated until the level is the requested number of times its size,
+# then NPCs, items and signs are scattered over the places they can stand at the requested densities
+#
+#   python -m benchmarks.levelgen --scale 10 --npcs 0.05 --out /tmp/level-10x.txt
+
+TEMPLATE = os.path.join('assets', 'levels', '2.txt')
+
+# Characters which only place an entity are blanked out of the template, and characters which place
+# an entity on top of a tile are replaced with the character for that tile alone
+ENTITIES = {char: ' ' for char in 'ETHPRLOC!@#$%^&*()o'}
+ENTITIES.update({'d': 's', 'p': 's', 'n': '-'})
+
+# Characters used to place each kind of entity, and the tiles that entities can stand on
+NPC, ITEMS, SIGN, SPAWN, EXIT = 'E', 'HP', '!', 'S', 'T'
+GROUND = set('WBGDIJgv:;')
+
+# The fraction of places entities can stand which get an NPC, an item or a sign by default,
+# which is about how densely they are placed in the template
+NPC_DENSITY = 0.05
+ITEM_DENSITY = 0.01
+SIGN_DENSITY = 0.025
+
+
+# Returns the rows of the template with every entity and spawn point removed, padded to the same width
+def read_template(path=TEMPLATE):
+    with open(path, 'r') as file:
+        rows = file.read().split('\n')
+    width = max(len(row) for row in rows)
+    return [''.join(ENTITIES.get(char, ' ' if char == SPAWN else char) for char in row).ljust(width) for row in rows]
+
+
+# Returns the layout of a level scale times the size of the template
+# Copies of the template are arranged in a grid which is as close to square as possible
+def generate(scale=1, npcs=NPC_DENSITY, items=ITEM_DENSITY, signs=SIGN_DENSITY, seed=0, template=TEMPLATE):
+    randomiser = random.Random(seed)
+    tile = read_template(template)
+    across = math.ceil(math.sqrt(scale))
+    down = math.ceil(scale / across)
+    blank = ' ' * len(tile[0])
+    grid = []
+    for copy_row in range(down):
+        copies = [copy_row * across + copy_column < scale for copy_column in range(across)]
+        for row in tile:
+            grid.append([char for present in copies for char in (row if present else blank)])
+
+    # Entities can stand in any blank cell directly above the ground
+    standing = [(column, row) for row in range(len(grid) - 1) for column in range(len(grid[row]))
+                if grid[row][column] == ' ' and grid[row + 1][column] in GROUND]
+    randomiser.shuffle(standing)
+    (spawn_column, spawn_row), (exit_column, exit_row) = standing.pop(), standing.pop()
+    grid[spawn_row][spawn_column] = SPAWN
+    grid[exit_row][exit_column] = EXIT
+    for column, row in standing:
+        roll = randomiser.random()
+        if roll < npcs:
+            grid[row][column] = NPC
+        elif roll < npcs + items:
+            grid[row][column] = randomiser.choice(ITEMS)
+        elif roll < npcs + items + signs:
+            grid[row][column] = SIGN
+    return '\n'.join(''.join(row).rstrip() for row in grid)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic level file.')
+    parser.add_argument('--scale', type=int, default=1, help='how many times the size of the template to make the level')
+    parser.add_argument('--npcs', type=float, default=NPC_DENSITY)
+    parser.add_argument('--items', type=float, default=ITEM_DENSITY)
+    parser.add_argument('--signs', type=float, default=SIGN_DENSITY)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--template', default=TEMPLATE)
+    parser.add_argument('--out', required=True)
+    args = parser.parse_args()
+
+    with open(args.out, 'w') as file:
+        file.write(generate(args.scale, args.npcs, args.items, args.signs, args.seed, args.template))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Measures how long the game takes to start, from launching Python to the first title screen frame being shown
+# Each run is a fresh process, so nothing is shared between runs through module or asset caches
+#
+#   python benchmarks/startup.py --runs 10
+#   python benchmarks/startup.py --root /path/to/other/checkout
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child process, from the root of the game, and prints its timings as JSON
+CHILD = '''
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.draw_title_screen("")
+main.pygame.display.update()
+title = time.perf_counter()
+print(json.dumps({"import": imported - start, "title": title - start}))
+'''
+
+
+def run(root):
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    output = subprocess.run([sys.executable, '-c', CHILD], cwd=root, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time how long the game takes to reach the title screen.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--root', default=ROOT, help='checkout of the game to measure')
+    args = parser.parse_args()
+
+    results = [run(args.root) for _ in range(args.runs)]
+    for phase in ('import', 'title'):
+        times = [result[phase] * 1000 for result in results]
+        print(f'{phase:>6}: median {statistics.median(times):7.1f} ms   min {min(times):7.1f} ms   max {max(times):7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+import argparse
+import json
+import os.path
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import pygame
+
+from benchmarks.headless import Keys, INPUTS, STEP, process_events
+from benchmarks.levelgen import generate
+from user.player import Player
+from world.level import Level
+from world.level_file import compile_layout
+from world.npc import Bullet
+
+# Times the hot paths of the game on synthetic levels 1, 10 and 100 times the size of level 2,
+# writes the results as JSON and compares them against a stored baseline
+# Every scale is run several times, and each benchmark's result is the median of its runs along with how much
+# the runs differed, so that a baseline records how noisy each benchmark is as well as how fast it was
+#
+#   python -m benchmarks.suite --output results.json
+#   python -m benchmarks.suite --baseline benchmarks/baseline.json
+#   python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+
+SCALES = (1, 10, 100)
+BASELINE = 'benchmarks/baseline.json'
+
+# How many times each scale is run, which should be the same for a baseline and the results compared against it
+RUNS = 5
+
+# How many times slower than the baseline a benchmark can be before it counts as a regression
+# Separate runs on the same busy or single core machine can differ by half, so only bigger slowdowns are reported
+TOLERANCE = 1.75
+
+# A slowdown also has to be more than this many times the spread of the benchmark's runs, in the results
+# and the baseline together, so that a benchmark which is noisy on the machine isn't reported for its noise
+NOISE_MARGIN = 5
+
+# Results of every scale which aren't timings
+INFO = ('entities', 'calibration', 'spread')
+
+# Levels whose baked chunks would take up more memory than this, in megabytes, are only drawn tile by tile
+MAX_BAKE_MB = 256
+
+# Size of the game window, which every draw benchmark draws onto
+SCREEN_SIZE = 832, 640
+
+
+# Returns the time, in seconds, that one call of a function took in the fastest of a number of batches
+# The fastest batch is the one least disturbed by anything else running on the machine
+# The setup function, if there is one, is called before every batch and isn't timed
+def measure(function, calls, batches=7, setup=None):
+    times = []
+    for _ in range(batches):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        for _ in range(calls):
+            function()
+        times.append((time.perf_counter() - started) / calls)
+    return min(times)
+
+
+# Returns how long a fixed amount of plain Python work takes, which is used to tell how fast the machine was running
+# Comparisons against the baseline are scaled by it, so a busy machine doesn't look like a regression
+def calibrate():
+    return measure(lambda: sum(index * index for index in range(10000)), 20)
+
+
+# Returns the positions the camera is moved to for draw benchmarks, spread evenly across the level
+def camera_positions(level, count=64):
+    randomiser = random.Random(0)
+    width, height = level.columns * 32, level.rows * 32
+    return [(randomiser.randrange(max(width - SCREEN_SIZE[0], 1)), randomiser.randrange(max(height - SCREEN_SIZE[1], 1)))
+            for _ in range(count)]
+
+
+# Time loading the level from a text level file and from a compiled level file
+def bench_load(layout, calls):
+    with tempfile.TemporaryDirectory() as directory:
+        text, compiled = os.path.join(directory, 'level.txt'), os.path.join(directory, 'level.lvl')
+        with open(text, 'w') as file:
+            file.write(layout)
+        with open(compiled, 'wb') as file:
+            file.write(compile_layout(layout, path=text))
+        return (measure(lambda: Level.from_file('Benchmark', text, bake_static=False), calls),
+                measure(lambda: Level.from_file('Benchmark', compiled, bake_static=False), calls))
+
+
+# Time drawing the level with the camera at positions across the level
+def bench_draw(level, surface, draw):
+    positions = camera_positions(level)
+    index = [0]
+
+    def step():
+        level.camera.x, level.camera.y = positions[index[0] % len(positions)]
+        index[0] += 1
+        draw(surface)
+    return measure(step, len(positions))
+
+
+# Time moving bullets, with a bullet in front of every NPC on the screen and more flying around the player
+# The level is reset before every batch, so NPCs and items killed or dropped by one batch aren't missing from the next
+def bench_bullets(level, player):
+    randomiser = random.Random(0)
+    camera = max(player.rect.x - SCREEN_SIZE[0] // 2, 0), max(player.rect.y - SCREEN_SIZE[1] // 2, 0)
+    bullets = [(camera[0] + randomiser.randrange(SCREEN_SIZE[0]), camera[1] + randomiser.randrange(SCREEN_SIZE[1]),
+                randomiser.choice((Bullet.LEFT, Bullet.RIGHT))) for _ in range(50)]
+
+    def setup():
+        level.reset()
+        level.camera.x, level.camera.y = camera
+        for x, y, facing in bullets:
+            level.level_bullets.fire(x, y, facing, player)
+    result = measure(level.update_bullets, 20, setup=setup)
+    level.reset()
+    return result
+
+
+# Time a whole headless frame, advancing the player and the level by one step and drawing them off screen
+def bench_frame(level, player, surface):
+    randomiser = random.Random()
+    keys = [Keys(set())]
+    tick = [0]
+
+    def frame():
+        if tick[0] % 45 == 0:
+            keys[0] = Keys(randomiser.choice(INPUTS))
+        tick[0] += 1
+        level.save_positions()
+        player.update(STEP, keys[0], level)
+        level.update(STEP)
+        process_events(player)
+        level.draw(surface)
+        player.draw(surface, level.camera)
+
+    # Every batch plays the same inputs from the same starting point
+    def setup():
+        randomiser.seed(0)
+        tick[0] = 0
+        player.reset()
+        level.reset()
+        spawn = level.get_spawn_point()
+        player.rect.x, player.rect.y = spawn.rect.x, spawn.rect.y - player.PLAYER_WIDTH / 2
+        level.align_spawn()
+    return measure(frame, 300, setup=setup)
+
+
+# Run every benchmark on a synthetic level scale times the size of level 2
+def run_scale(scale, max_bake_mb=MAX_BAKE_MB):
+    layout = generate(scale)
+    surface = pygame.Surface(SCREEN_SIZE).convert()
+    calibration = calibrate()
+    results = {'parse': measure(lambda: Level('Benchmark', layout, bake_static=False), max(30 // scale, 3))}
+    results['load_text'], results['load_compiled'] = bench_load(layout, max(30 // scale, 3))
+
+    level = Level('Benchmark', layout, bake_static=False)
+    player = Player()
+    pygame.player, pygame.level = player, level
+    spawn = level.get_spawn_point()
+    player.rect.x, player.rect.y = spawn.rect.x, spawn.rect.y - player.PLAYER_WIDTH / 2
+
+    # Work out how much memory the baked chunks would take up, before baking them
+    size = level.CHUNK_SIZE
+    chunks = {(index % level.columns * 32 // size, index // level.columns * 32 // size)
+              for index, tile_id in enumerate(level.tiles) if tile_id}
+    if len(chunks) * size * size * 4 / 1024 / 1024 <= max_bake_mb:
+        started = time.perf_counter()
+        level.bake()
+        level.bake_static = True
+        results['bake'] = time.perf_counter() - started
+        results['draw'] = bench_draw(level, surface, level.draw)
+    results['draw_tiles'] = bench_draw(level, surface, level.draw_tiles)
+
+    results['scroll'] = measure(lambda: level.scroll(1, -1), 10000)
+    randomiser = random.Random(0)
+    width, height = level.columns * 32, level.rows * 32
+    points = [(randomiser.randrange(width), randomiser.randrange(height)) for _ in range(1000)]
+    results['check_collision'] = measure(lambda: [player.check_collision(level, point) for point in points], 1) / len(points)
+    results['update_bullets'] = bench_bullets(level, player)
+    results['frame'] = bench_frame(level, player, surface)
+    results['entities'] = level.stats['objects'] + level.stats['npcs']
+    results['calibration'] = (calibration + calibrate()) / 2
+    level.unload()
+    return results
+
+
+# Run every benchmark on a scale a number of times, returning the median of each benchmark's runs
+# and, under 'spread', the median distance of its runs from that median, as a fraction of the median
+# The median distance isn't thrown off by a single run that was disturbed, unlike the range or standard deviation
+# Benchmarks are only compared after being scaled by the calibration of their own run, so runs on a busier machine agree
+def run_median(scale, runs=RUNS, max_bake_mb=MAX_BAKE_MB):
+    samples = [run_scale(scale, max_bake_mb) for _ in range(runs)]
+    calibration = statistics.median(run['calibration'] for run in samples)
+    results = {'entities': samples[0]['entities'], 'calibration': calibration, 'spread': {}}
+    for name in samples[0]:
+        if name in INFO:
+            continue
+        calibrated = [run[name] / run['calibration'] for run in samples]
+        median = statistics.median(calibrated)
+        results[name] = median * calibration
+        deviation = statistics.median(abs(value - median) for value in calibrated)
+        results['spread'][name] = deviation / median if median else 0.0
+    return results
+
+
+# Returns the benchmarks that got slower than the baseline by more than the tolerance and by more than
+# NOISE_MARGIN times their spread, with how many times slower they are and the slowdown needed to be reported
+# Timings are divided by the calibration of the run they came from, so that only the game's own slowdowns are counted
+def compare(results, baseline, tolerance=TOLERANCE, noise_margin=NOISE_MARGIN):
+    regressions = []
+    for scale, timings in results['results'].items():
+        before = baseline['results'].get(scale, {})
+        for name, seconds in timings.items():
+            if name in INFO or not before.get(name):
+                continue
+            ratio = (seconds / timings['calibration']) / (before[name] / before['calibration'])
+            noise = timings.get('spread', {}).get(name, 0.0) + before.get('spread', {}).get(name, 0.0)
+            threshold = max(tolerance, 1 + noise_margin * noise)
+            if ratio > threshold:
+                regressions.append((scale, name, ratio, threshold))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the game on synthetic levels.')
+    parser.add_argument('--scales', type=int, nargs='*', default=list(SCALES))
+    parser.add_argument('--output', help='file to write the results to as JSON')
+    parser.add_argument('--baseline', help='results to compare against, exits with an error if anything regressed')
+    parser.add_argument('--save-baseline', help='file to write the results to as the new baseline')
+    parser.add_argument('--runs', type=int, default=RUNS, help='how many times to run each scale')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--noise-margin', type=float, default=NOISE_MARGIN)
+    parser.add_argument('--max-bake-mb', type=float, default=MAX_BAKE_MB)
+    args = parser.parse_args()
+
+    results = {'meta': {'python': platform.python_version(), 'pygame': pygame.version.ver,
+                        'machine': platform.machine(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'runs': args.runs},
+               'results': {}}
+    for scale in args.scales:
+        timings = run_median(scale, args.runs, args.max_bake_mb)
+        results['results'][f'{scale}x'] = timings
+        print(f'{scale}x ({timings["entities"]} entities, median of {args.runs} runs)')
+        for name, seconds in timings.items():
+            if name not in INFO:
+                print(f'  {name:<16} {seconds * 1000:10.4f} ms  ±{timings["spread"][name] * 100:5.1f}%')
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as file:
+                json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            regressions = compare(results, json.load(file), args.tolerance, args.noise_margin)
+        for scale, name, ratio, threshold in regressions:
+            print(f'REGRESSION {scale} {name}: {ratio:.2f}x slower than the baseline (allowed {threshold:.2f}x)')
+        if regressions:
+            sys.exit(1)
+        print('No regressions against', args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+import os.path
+import time
+
+from engine.sounds import SOUNDS
+from engine.textures import TEXTURES
+
+
+# An asset that is only loaded the first time it is used, rather than when the module defining it is imported
+# Assets are used as class attributes, so reading the attribute from a class or an instance returns the loaded asset
+class Asset:
+
+    # The loaded asset, or None until it has been loaded
+    value: object
+
+    def __init__(self, loader=None):
+        self.loader = loader
+        self.value = None
+        self.name = None
+        ASSETS.add(self)
+
+    # Remember the attribute name, so that the registry can report which assets are slow to load
+    def __set_name__(self, owner, name):
+        self.name = f'{owner.__name__}.{name}'
+
+    def __get__(self, instance, owner=None):
+        return self.get()
+
+    # Return the asset, loading it if this is the first time it has been used
+    def get(self):
+        if self.value is None:
+            start = time.perf_counter()
+            self.value = self.load()
+            ASSETS.record(self, time.perf_counter() - start)
+        return self.value
+
+    def load(self):
+        return self.loader()
+
+    def loaded(self):
+        return self.value is not None
+
+
+# A texture loaded through the texture cache, optionally scaled and flipped
+class Image(Asset):
+
+    def __init__(self, path, size=None, flip=False):
+        super().__init__()
+        self.path = path
+        self.size = size
+        self.flip = flip
+
+    def load(self):
+        return TEXTURES.get(self.path, self.size, self.flip)
+
+
+# A sound loaded through the sound bank
+class Sound(Asset):
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def load(self):
+        return SOUNDS.get(self.path)
+
+
+# Every sound in a directory with the given file extension
+class Sounds(Asset):
+
+    def __init__(self, directory, extension):
+        super().__init__()
+        self.directory = directory
+        self.extension = extension
+
+    def load(self):
+        files = [f for f in sorted(os.listdir(self.directory))
+                 if os.path.isfile(os.path.join(self.directory, f)) and f.lower().endswith(self.extension)]
+        return [SOUNDS.get(os.path.join(self.directory, f)) for f in files]
+
+
+# A list of other assets, such as the frames of an animation
+class AssetList(Asset):
+
+    def __init__(self, *assets):
+        super().__init__()
+        self.assets = assets
+
+    def load(self):
+        return [asset.get() for asset in self.assets]
+
+
+# Keeps track of every asset, so they can be loaded in bulk before they are first needed
+class AssetRegistry:
+
+    assets: list
+    load_time: float
+
+    def __init__(self):
+        self.assets = []
+        self.load_time = 0.0
+        self.slowest = (None, 0.0)
+
+    def add(self, asset):
+        self.assets.append(asset)
+
+    def record(self, asset, seconds):
+        self.load_time += seconds
+        if seconds > self.slowest[1]:
+            self.slowest = (asset.name, seconds)
+
+    # Returns the assets that have not been loaded yet
+    def pending(self):
+        return [asset for asset in self.assets if not asset.loaded()]
+
+    # Load assets that have not been used yet, either all of them or at most count of them
+    # Returns the number of assets that are still waiting to be loaded
+    def warm(self, count=None):
+        pending = self.pending()
+        for asset in pending[:count]:
+            asset.get()
+        return len(pending) - len(pending[:count])
+
+    def stats(self):
+        return {'assets': len(self.assets), 'loaded': len(self.assets) - len(self.pending()),
+                'load_time': self.load_time, 'slowest': self.slowest[0]}
+
+
+# The registry used by the whole game
+ASSETS = AssetRegistry()
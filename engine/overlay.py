@@ -0,0 +1,29 @@
+import pygame
+
+
+# Translucent window sized surfaces used to tint the screen, created once for each colour
+# Fades only change the alpha of an existing surface, so drawing an overlay never allocates a new one
+class Overlays:
+
+    # Surfaces filled with each colour, keyed by the colour
+    surfaces: dict
+
+    def __init__(self, size, colours=()):
+        self.size = size
+        self.surfaces = {}
+        for colour in colours:
+            self.create(colour)
+
+    def create(self, colour):
+        surface = pygame.Surface(self.size)
+        surface.fill(colour)
+        self.surfaces[tuple(colour)] = surface
+        return surface
+
+    # Returns the overlay for a colour set to an alpha value between 0 and 255
+    def get(self, colour, alpha=180):
+        surface = self.surfaces.get(tuple(colour))
+        if surface is None:
+            surface = self.create(colour)
+        surface.set_alpha(max(0, min(255, int(alpha))))
+        return surface
@@ -0,0 +1,125 @@
+import csv
+import datetime
+import os.path
+import time
+from collections import deque
+
+import pygame
+
+from engine.text import TEXT
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+
+
+# Times each phase of the game loop, keeping the timings of the most recent frames to show how long each phase takes
+# A frame is split into phases with lap, which adds the time since the previous lap to a phase
+class Profiler:
+
+    # The phases of the game loop, in the order they happen, and how many frames of timings are kept
+    PHASES = ('events', 'player', 'level', 'draw', 'interactions', 'overlays', 'display')
+    WINDOW = 600
+
+    # How many frames the overlay's text is kept for before it is worked out again
+    REFRESH = 15
+
+    # Where timings are saved to, next to the game's other files rather than wherever the game was started from
+    PROFILE_DIR = os.path.join(os.path.expanduser('~'), '.athora', 'profiles')
+
+    # Seconds spent in each phase of the frame being timed, and the timings of previous frames, oldest first
+    # Each previous frame is a tuple of the time spent in each phase, the whole frame and the entity counts
+    current: dict
+    frames: deque
+    enabled: bool
+
+    # The path of the last CSV file the timings were written to, which is shown in the overlay
+    saved: str | None
+
+    def __init__(self, phases=PHASES, window=WINDOW):
+        self.phases = phases
+        self.frames = deque(maxlen=window)
+        self.current = dict.fromkeys(phases, 0.0)
+        self.enabled = False
+        self.counts = (0, 0, 0, 0)
+        self.started = self.last = time.perf_counter()
+        self.lines = []
+        self.age = 0
+        self.saved = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.age = 0
+
+    def begin_frame(self):
+        self.current = dict.fromkeys(self.phases, 0.0)
+        self.started = self.last = time.perf_counter()
+
+    # Add the time since the previous lap, or the start of the frame, to a phase
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    # Record how many objects, visible objects, NPCs and bullets are in the level
+    def count(self, level):
+        self.counts = (len(level.level_objects), level.visible, len(level.level_npc), len(level.level_bullets))
+
+    def end_frame(self):
+        self.frames.append(tuple(self.current[phase] for phase in self.phases)
+                           + (time.perf_counter() - self.started,) + self.counts)
+
+    # Returns the 50th, 95th and 99th percentile and the worst time, in seconds, of a phase over the recent frames
+    def percentiles(self, phase):
+        column = self.phases.index(phase) if phase in self.phases else len(self.phases)
+        times = sorted(frame[column] for frame in self.frames)
+        if not times:
+            return 0.0, 0.0, 0.0, 0.0
+        return tuple(times[min(int(len(times) * percent), len(times) - 1)] for percent in (0.5, 0.95, 0.99)) + (times[-1],)
+
+    # Returns a line of text for each phase, and for the whole frame, as well as the entity counts
+    # and where the timings were last saved to
+    def report(self):
+        lines = ['phase          p50    p95    p99  worst']
+        for phase in self.phases + ('frame',):
+            times = ' '.join(f'{seconds * 1000:6.2f}' for seconds in self.percentiles(phase))
+            lines.append(f'{phase:<12} {times}')
+        objects, visible, npcs, bullets = self.counts
+        lines.append(f'objects {objects} ({visible} visible)  npcs {npcs}  bullets {bullets}')
+        if self.saved is not None:
+            lines.append(f'saved {self.saved}')
+        return lines
+
+    # Draw the report in the top left of the screen, below the player's health
+    # The report is only worked out again every REFRESH frames, so that it doesn't cost much to show
+    def draw(self, surface, position=(5, 50)):
+        if self.age % self.REFRESH == 0:
+            self.lines = [TEXT.render(line, 8, WHITE) for line in self.report()]
+        self.age += 1
+        width = max(line.get_width() for line in self.lines) + 10
+        height = sum(line.get_height() + 4 for line in self.lines) + 6
+        pygame.draw.rect(surface, BLACK, (position[0], position[1], width, height))
+        y = position[1] + 5
+        for line in self.lines:
+            surface.blit(line, (position[0] + 5, y))
+            y += line.get_height() + 4
+
+    # Write the timings of the recent frames, in milliseconds, to a CSV file and return its path
+    # Files are named after the time they were written and kept in PROFILE_DIR, unless a path is given
+    # The overlay is worked out again on the next frame, so it shows the path straight away
+    def dump(self, path=None):
+        if path is None:
+            os.makedirs(self.PROFILE_DIR, exist_ok=True)
+            path = os.path.join(self.PROFILE_DIR, f"profile-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.csv")
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.phases + ('frame', 'objects', 'visible', 'npcs', 'bullets'))
+            for frame in self.frames:
+                times = frame[:len(self.phases) + 1]
+                writer.writerow([f'{seconds * 1000:.3f}' for seconds in times] + list(frame[len(self.phases) + 1:]))
+        self.saved = path
+        self.age = 0
+        return path
+
+
+# The profiler used by the whole game
+PROFILER = Profiler()
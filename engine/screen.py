@@ -0,0 +1,51 @@
+import pygame
+
+
+# A screen made of a background which is composed once, and parts which are only drawn again when they change
+# Drawing returns the areas of the screen which changed, so only those need to be pushed to the display
+class CachedScreen:
+
+    # A function which returns the background, which is called the first time the screen is drawn
+    compose: callable
+    background: pygame.Surface | None
+
+    # The key and area of each part the last time it was drawn, and if the background is on the screen
+    parts: dict
+    drawn: bool
+
+    def __init__(self, compose):
+        self.compose = compose
+        self.background = None
+        self.parts = {}
+        self.drawn = False
+
+    # Forget what is on the screen, so that the next draw covers it all again, such as after something else was drawn
+    def invalidate(self):
+        self.parts = {}
+        self.drawn = False
+
+    # Draw the screen, given a dictionary of each part's name and a (key, render) tuple
+    # A part is only rendered again if its key changed, and render returns the image and where to draw it
+    # Returns a list of rectangles covering everything on the surface which changed
+    def draw(self, surface, parts):
+        if self.background is None:
+            self.background = self.compose()
+        dirty = []
+        if not self.drawn:
+            surface.blit(self.background, (0, 0))
+            dirty.append(surface.get_rect())
+            self.parts = {}
+            self.drawn = True
+        for name, (key, render) in parts.items():
+            previous = self.parts.get(name)
+            if previous is not None and previous[0] == key:
+                continue
+            # Cover up the part where it was last drawn with the background, before drawing it again
+            if previous is not None:
+                surface.blit(self.background, previous[1], previous[1])
+                dirty.append(previous[1])
+            image, position = render()
+            rect = surface.blit(image, position)
+            self.parts[name] = (key, rect)
+            dirty.append(rect)
+        return dirty
@@ -0,0 +1,29 @@
+import pygame
+
+
+# Returns a copy of an attribute value which later changes to the original won't affect
+# Rectangles, lists and dictionaries are copied, everything else, like surfaces and sounds, is shared
+def copy_value(value):
+    if isinstance(value, (pygame.Rect, list, dict)):
+        return value.copy()
+    return value
+
+
+# A record of the attributes of an object, which can be restored to put the object back in the state it was in
+# Attributes named in exclude are neither recorded nor changed when the snapshot is restored
+class Snapshot:
+
+    obj: object
+    state: dict
+
+    def __init__(self, obj, exclude=()):
+        self.obj = obj
+        self.exclude = exclude
+        self.state = {name: copy_value(value) for name, value in vars(obj).items() if name not in exclude}
+
+    # Put every recorded attribute back, and remove attributes that were set after the snapshot was taken
+    def restore(self):
+        attributes = vars(self.obj)
+        for name in [name for name in attributes if name not in self.state and name not in self.exclude]:
+            del attributes[name]
+        attributes.update({name: copy_value(value) for name, value in self.state.items()})
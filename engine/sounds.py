@@ -0,0 +1,94 @@
+import glob
+import hashlib
+import os.path
+
+import pygame
+
+
+# A process-wide cache of decoded sounds, so every file is only decoded once no matter how many things play it
+# Decoded samples can also be kept on disk, converted to the mixer's frequency and format, so that compressed
+# files like FLAC, MP3 and OGG don't have to be decoded again the next time the game starts
+# The disk cache is off unless a directory is given for it
+class SoundBank:
+
+    # The environment variable which turns on the disk cache for the game's sound bank, holding the directory to use
+    CACHE_VARIABLE = 'ATHORA_SOUND_CACHE'
+
+    # Cached sounds, keyed by their path, and counters used to measure how effective the caches are
+    sounds: dict
+    hits: int
+    misses: int
+    decoded: int
+
+    # Where decoded samples are kept on disk, or None to always decode sounds from their files
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.sounds = {}
+        self.hits = 0
+        self.misses = 0
+        self.decoded = 0
+
+    # Return the sound for a file, loading it only if it is not already cached
+    def get(self, path):
+        key = os.path.normpath(path)
+        sound = self.sounds.get(key)
+        if sound is not None:
+            self.hits += 1
+            return sound
+        self.misses += 1
+        sound = self.load(key)
+        self.sounds[key] = sound
+        return sound
+
+    # Load a sound from the disk cache if it has samples for the file as it is now, otherwise decode the file
+    # and save its samples to the disk cache
+    def load(self, path):
+        if self.cache_dir is None:
+            self.decoded += 1
+            return pygame.mixer.Sound(path)
+        cache_path = self.cache_path(path)
+        try:
+            with open(cache_path, 'rb') as file:
+                return pygame.mixer.Sound(buffer=file.read())
+        except (OSError, pygame.error):
+            pass
+        self.decoded += 1
+        sound = pygame.mixer.Sound(path)
+        self.save(path, cache_path, sound)
+        return sound
+
+    # Returns where the samples of a file are kept on disk
+    # The name changes whenever the file is modified or the mixer is set up differently, so old samples are never used
+    def cache_path(self, path):
+        frequency, size, channels = pygame.mixer.get_init()
+        modified = os.stat(path).st_mtime_ns
+        return os.path.join(self.cache_dir, f'{self.prefix(path)}-{modified}-{frequency}-{size}-{channels}.pcm')
+
+    # Returns the start of the name of every file in the disk cache for a sound file
+    @staticmethod
+    def prefix(path):
+        return hashlib.sha1(path.encode()).hexdigest()[:16]
+
+    # Write the samples of a sound to the disk cache, replacing the samples of older versions of the file
+    # The samples are written to a temporary file first, so a half written file is never read back
+    # The disk cache is only there to speed things up, so it is skipped if it can't be written to
+    def save(self, path, cache_path, sound):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for old in glob.glob(os.path.join(self.cache_dir, self.prefix(path) + '-*.pcm')):
+                os.remove(old)
+            with open(cache_path + '.tmp', 'wb') as file:
+                file.write(sound.get_raw())
+            os.replace(cache_path + '.tmp', cache_path)
+        except OSError:
+            pass
+
+    # Returns the hit and miss counters, how many files had to be decoded, and the number of sounds currently cached
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'decoded': self.decoded, 'size': len(self.sounds),
+                'hit_rate': self.hits / total if total else 0.0}
+
+
+# The sound bank used by the whole game, which only keeps samples on disk if the environment variable is set
+SOUNDS = SoundBank(os.environ.get(SoundBank.CACHE_VARIABLE) or None)
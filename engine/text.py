@@ -0,0 +1,78 @@
+import os.path
+from collections import OrderedDict
+
+import pygame
+
+WHITE = (255, 255, 255)
+
+
+# Renders text in the game font, reusing fonts and rendered surfaces between frames
+# Fonts are kept for every size used, and rendered surfaces are kept in a least recently used cache
+class TextRenderer:
+
+    FONT_PATH = os.path.join('assets', 'fonts', 'pressstart.ttf')
+
+    # The most memory, in bytes, that cached surfaces can take up before the least recently used are removed
+    MAX_BYTES = 8 * 1024 * 1024
+
+    # Loaded fonts keyed by pixel size, and rendered surfaces keyed by (text, size, colour, alpha)
+    fonts: dict
+    surfaces: OrderedDict
+    size: int
+
+    # Counters used to measure how effective the cache is
+    hits: int
+    misses: int
+
+    def __init__(self, path=FONT_PATH, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    # Returns the game font at a pixel size, only opening the font file the first time a size is used
+    def get_font(self, px):
+        font = self.fonts.get(px)
+        if font is None:
+            font = pygame.font.Font(self.path, px)
+            self.fonts[px] = font
+        return font
+
+    # Returns a surface with text in the game font
+    # The surface is shared with every other call using the same arguments, so it must not be drawn on
+    def render(self, text, px, color=WHITE, alpha=None):
+        key = (text, px, tuple(color), alpha)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.get_font(px).render(text, True, color)
+        surface.set_alpha(alpha) if alpha is not None else None
+        self.surfaces[key] = surface
+        self.size += self.surface_bytes(surface)
+        while self.size > self.max_bytes and len(self.surfaces) > 1:
+            self.size -= self.surface_bytes(self.surfaces.popitem(last=False)[1])
+        return surface
+
+    @staticmethod
+    def surface_bytes(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def clear(self):
+        self.surfaces.clear()
+        self.size = 0
+
+    # Returns the hit and miss counters, as well as how many fonts and surfaces are cached
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'fonts': len(self.fonts), 'surfaces': len(self.surfaces),
+                'bytes': self.size, 'hit_rate': self.hits / total if total else 0.0}
+
+
+# The text renderer used by the whole game
+TEXT = TextRenderer()
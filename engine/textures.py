@@ -0,0 +1,59 @@
+import os.path
+import sys
+
+import pygame
+
+
+# A process-wide cache of converted surfaces, shared by every level object, NPC and inventory item
+# Entries are keyed by the texture path, the size it was scaled to and whether it was flipped
+class TextureCache:
+
+    # Cached surfaces and counters used to measure how effective the cache is
+    surfaces: dict
+    hits: int
+    misses: int
+
+    def __init__(self):
+        self.surfaces = {}
+        self.hits = 0
+        self.misses = 0
+
+    # Return the surface for a texture, loading, scaling and flipping it only if it is not already cached
+    # The unscaled image is cached as well, so differently sized copies of a texture only decode the file once
+    def get(self, path, size=None, flip=False):
+        key = (os.path.normpath(path), None if size is None else (int(size[0]), int(size[1])), flip)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+        self.misses += 1
+        if size is None and not flip:
+            surface = pygame.image.load(path).convert_alpha()
+        elif flip:
+            surface = pygame.transform.flip(self.get(path, size), True, False)
+        else:
+            surface = pygame.transform.scale(self.get(path), key[1])
+        self.surfaces[key] = surface
+        return surface
+
+    # Remove cached surfaces, either every entry or only those for the given path
+    # If unused is True, only surfaces that are no longer referenced outside the cache are removed
+    def evict(self, path=None, unused=False):
+        path = None if path is None else os.path.normpath(path)
+        for key in list(self.surfaces):
+            if path is not None and key[0] != path:
+                continue
+            # One reference is held by the dictionary and one by the call to getrefcount
+            if unused and sys.getrefcount(self.surfaces[key]) > 2:
+                continue
+            del self.surfaces[key]
+
+    # Returns the hit and miss counters, as well as the number of surfaces currently cached
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.surfaces),
+                'hit_rate': self.hits / total if total else 0.0}
+
+
+# The cache used by the whole game
+TEXTURES = TextureCache()
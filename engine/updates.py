@@ -0,0 +1,88 @@
+import json
+import os.path
+import threading
+import time
+
+
+# Checks GitHub for a newer release of the game on a background thread, so the game never waits for the network
+# The latest release is cached on disk, so the check is only repeated once the cached result is older than the TTL
+class UpdateChecker:
+
+    URL = "https://api.github.com/repos/Nulfy/Athora-SFSB/releases/latest"
+    CACHE_PATH = os.path.join(os.path.expanduser('~'), '.athora', 'update_check.json')
+
+    # How long, in seconds, a cached result is used for, and how long to wait for a response
+    TTL = 6 * 60 * 60
+    TIMEOUT = 3
+
+    # Messages shown on the title screen
+    NEW_VERSION = "There is a new version available! Click here to download."
+    NO_CONNECTION = "Cannot check for updates."
+
+    # The message to show on the title screen, which is empty until the check has finished
+    message: str
+    done: threading.Event
+
+    def __init__(self, version, url=URL, cache_path=CACHE_PATH, ttl=TTL, timeout=TIMEOUT):
+        self.version = version
+        self.url = url
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.timeout = timeout
+        self.message = ""
+        self.done = threading.Event()
+        self.thread = None
+
+    # Start checking for updates, unless a check has already been started
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.check, daemon=True)
+            self.thread.start()
+
+    # Find the latest release, from the cache if it is recent enough, otherwise from GitHub
+    # Failed requests, error responses and responses without a release all count as having no connection,
+    # as does not having requests installed
+    # requests is only imported here so that it does not slow down starting the game
+    def check(self):
+        try:
+            import requests
+            latest = self.read_cache()
+            if latest is None:
+                latest = self.fetch()
+                self.write_cache(latest)
+            self.message = self.NEW_VERSION if latest != self.version else ""
+        except ImportError:
+            self.message = self.NO_CONNECTION
+        except (requests.RequestException, KeyError, ValueError):
+            self.message = self.NO_CONNECTION
+        finally:
+            self.done.set()
+
+    # Returns the tag of the latest release from GitHub
+    def fetch(self):
+        import requests
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["tag_name"]
+
+    # Returns the cached tag of the latest release, or None if there is no cached result, it has expired,
+    # or the cache file isn't one this checker wrote
+    def read_cache(self):
+        try:
+            with open(self.cache_path, 'r') as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cache, dict) or not isinstance(cache.get('checked'), (int, float)):
+            return None
+        if time.time() - cache['checked'] > self.ttl:
+            return None
+        return cache.get('tag_name')
+
+    def write_cache(self, tag_name):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, 'w') as file:
+                json.dump({'checked': time.time(), 'tag_name': tag_name}, file)
+        except OSError:
+            pass
@@ -4,10 +4,21 @@ import sys
 import webbrowser
 
 import pygame
-import requests
 
 from pygame.locals import *
 
+from engine.assets import ASSETS, Sound
+from engine.overlay import Overlays
+from engine.profiler import PROFILER
+from engine.screen import CachedScreen
+from engine.text import TEXT
+from engine.updates import UpdateChecker
+from user.inv_objects import Gun, Potion, MagentaCartridge, Ammo
+from user.player import Player
+from world import level_file
+from world.level import Levels
+from world.level_objects import InteractiveType, ExitDoor, DroppedItem, Sign, Lava
+
 version = "beta-v0.2"
 
 # Enable double buffer
@@ -57,8 +68,26 @@ SIGNPOST_WIDTH, SIGNPOST_HEIGHT = 600, 120
 SIGNPOST_IMG = pygame.image.load(os.path.join('assets', 'textures', 'overlay', 'signpost.png')).convert()
 SIGNPOST = pygame.transform.scale(SIGNPOST_IMG, (SIGNPOST_WIDTH, SIGNPOST_HEIGHT))
 
-# Constant for game's frames per second
+# Create the overlays used to tint the screen when paused, damaged or changing levels
+OVERLAYS = Overlays((WIDTH, HEIGHT), (GRAY, RED, POTION, BLACK))
+
+# The check for a new release, which only runs once while the game is open
+UPDATE_CHECK = UpdateChecker(version)
+
+# Constant for game's steps per second, and the length of each step of the game in seconds
 FPS = 60
+STEP = 1 / FPS
+
+# The most frames drawn per second while playing, 0 draws as many frames as the computer can
+FRAME_LIMIT = 0
+
+# The longest time, in milliseconds, to wait for an event while nothing on the screen is changing
+# The screen is still checked this often, for changes which don't come from events like the update check finishing
+IDLE_TIMEOUT = 250
+
+# The most steps run for one frame, and the longest frame that is caught up on, so a slow frame can't snowball
+MAX_STEPS = 5
+MAX_FRAME_TIME = 0.25
 
 # Enum values to be used for readable code:
 TITLE, PAUSED, CONTINUE, TRANSITION = -1, 0, 1, 2  # Game state
@@ -69,27 +98,17 @@ AMMO_PICKED, AMMO_EVENT, AMMO_ELAPSED = 0, 1, 2  # Ammo tuple indexes
 
 # Set an audio channel to be used only for background music
 AMBIENCE_CHANNEL = pygame.mixer.Channel(6)
-AMBIENCE = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'misc', 'ambience.wav'))
+AMBIENCE = Sound(os.path.join('assets', 'sounds', 'misc', 'ambience.wav'))
 
 
-# Import modules intentionally after pygame is initialised to allow for image conversion
-from user.inv_objects import Gun, Potion, MagentaCartridge, Ammo
-from user.player import Player
-from world.level import Level, Levels
-from world.level_objects import InteractiveType, ExitDoor, CollideType, DroppedItem, Sign, Lava
-from world.npc import RobotEnemy, NPC
-
-
-# Returns a list containing the contents of each level file in the game assets
+# Returns a list containing the path of each level file in the game assets
+# The files are only read when each level is built
+# Levels which have been compiled since their text was last changed are loaded from the compiled file instead
 def get_levels():
-    levels = []
     levels_dir = os.path.join('assets', 'levels')
     level_files = [f for f in os.listdir(levels_dir)
                    if os.path.isfile(os.path.join(levels_dir, f)) and f.lower().endswith(".txt")]
-    for level in sorted(level_files, key=level_sorter):
-        with open(f'{os.path.join(levels_dir, level)}', 'r') as file:
-            levels.append(file.read())
-    return levels
+    return [level_file.newest(os.path.join(levels_dir, level)) for level in sorted(level_files, key=level_sorter)]
 
 
 # Sort the levels in ascending order
@@ -97,30 +116,39 @@ def level_sorter(x):
     return os.path.split(x)[-1]
 
 
+# Returns the events waiting to be handled
+# If idle, nothing on the screen is changing, so wait for an event first rather than drawing frames which look the same
+def get_events(idle):
+    if idle:
+        event = pygame.event.wait(IDLE_TIMEOUT)
+        if event.type != pygame.NOEVENT:
+            return [event] + pygame.event.get()
+    return pygame.event.get()
+
+
+# Returns if the window was uncovered or restored, so what is in it has to be drawn again
+def exposed(events):
+    return any(event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED) for event in events)
+
+
 # Returns a surface with text in the game font
+# Surfaces are cached by the text renderer, so they must not be drawn on
 def render_text(text, px, color=WHITE, alpha=None):
-    font = pygame.font.Font(os.path.join('assets', 'fonts', 'pressstart.ttf'), px)
-    text = font.render(text, True, color)
-    text.set_alpha(alpha) if alpha is not None else None
-    return text
+    return TEXT.render(text, px, color, alpha)
 
 
 # Returns a surface, the same size as the game window, with a translucent colour overlay
+# The same surface is reused for each colour, only changing its alpha
 def create_overlay_surface(colour, alpha=180):
-    surface = pygame.Surface((WIDTH, HEIGHT))
-    surface.set_alpha(alpha)
-    surface.fill(colour)
-    return surface
+    return OVERLAYS.get(colour, alpha)
 
 
-# Draw the background, current level, player, timer and bullets on the window surface
-def draw_window(player, level, elapsed_time, state):
+# Draw the background, current level, player and timer on the window surface
+def draw_window(player, level, elapsed_time):
     WIN.blit(BACKGROUND_SURFACE, (0, 0))
     level.draw(WIN)
     if player.HEALTH > 0:
-        if state == CONTINUE:
-            draw_bullets(player, level)
-        player.draw(WIN)
+        player.draw(WIN, level.camera)
         title = render_text(level.title, 28)
         score_text = render_text("Score: " + str(player.get_score()), 20)
         ammo_text = render_text("Ammo: " + str(player.get_ammo()), 20)
@@ -131,39 +159,6 @@ def draw_window(player, level, elapsed_time, state):
         WIN.blit(ammo_text, (WIDTH - 5 - ammo_text.get_width(), title.get_height() + title.get_height() / 2 + timer.get_height() + timer.get_height() / 3 + score_text.get_height() + score_text.get_height() / 3))
 
 
-# Calculate and draw the position of all bullets on the screen
-# Update bullets if they collide with an entity or an object
-def draw_bullets(player, level):
-    npc_collision = False
-    bullets = level.level_bullets.copy()
-    for bullet in bullets:
-        for npc in level.level_npc:
-            if bullet.rect.colliderect(npc.rect) and isinstance(bullet.origin(), Player):
-                npc.change_health(-1)
-                npc_collision = True
-            if npc.HEALTH <= 0:
-                player.add_score(10)
-                for i, x in enumerate(npc.inventory):
-                    level.level_objects.append(DroppedItem((npc.rect.x + 32*i)/32, npc.rect.y/32, x))
-                level.level_npc.remove(npc)
-        if bullet.facing == bullet.LEFT:
-            bullet.rect.x -= bullet.SPEED
-        if bullet.facing == bullet.RIGHT:
-            bullet.rect.x += bullet.SPEED
-        if bullet.rect.x < 0 or bullet.rect.x > WIDTH:
-            level.level_bullets.remove(bullet)
-        elif bullet.rect.colliderect(player.rect) and isinstance(bullet.origin(), NPC):
-            player.change_hp(-1)
-            level.level_bullets.remove(bullet)
-        elif npc_collision:
-            level.level_bullets.remove(bullet)
-        elif any(wall.rect.colliderect(bullet.rect) and isinstance(wall, CollideType) for wall in level.level_objects):
-            level.level_bullets.remove(bullet)
-        else:
-            bullet.draw(WIN)
-        npc_collision = False
-
-
 # Draw a window sized overlay above the game window with a title and subheading
 def draw_overlay(colour, title, subheading):
     WIN.blit(create_overlay_surface(colour), (0, 0))
@@ -198,16 +193,17 @@ def check_for_interactions(level, player, pending_reload):
     for level_object in level.level_objects:
         if isinstance(level_object, InteractiveType):
             if level_object.rect.colliderect(player.rect):
-                draw_popup(level_object.POPUP, player) if not pending_reload else None
+                draw_popup(level_object.POPUP, player, level.camera) if not pending_reload else None
                 return True, level_object
     return False, None
 
 
 # Draw a small text popup above the player's head
-def draw_popup(text, player, color=WHITE):
+def draw_popup(text, player, camera, color=WHITE):
     popup_text = render_text(text, 12, color=color)
-    WIN.blit(popup_text, (player.rect.x + player.PLAYER_WIDTH / 2 - popup_text.get_width() / 2,
-                          player.rect.y - player.PLAYER_HEIGHT / 3))
+    x, y = camera.project(player.rect)
+    WIN.blit(popup_text, (x + player.PLAYER_WIDTH / 2 - popup_text.get_width() / 2,
+                          y - player.PLAYER_HEIGHT / 3))
 
 
 # Draw a large signpost texture with a multi-line text popup at the bottom of the screen
@@ -223,38 +219,58 @@ def draw_sign(text):
     WIN.blit(exit_text, (SIGNPOST_WIDTH - exit_text.get_width(), HEIGHT - exit_text.get_height() - 10))
 
 
+# Returns the background of the title screen, with the logo, subtitle and version, which never change
+def compose_title_screen():
+    surface = BACKGROUND.copy()
+    logo = render_text("Athora", 60)
+    version_text = render_text(version, 12, color=YELLOW)
+    sub_logo = render_text("SpaceF Strikes Back", 15)
+    surface.blit(logo, (WIDTH / 2 - logo.get_width() / 2, HEIGHT / 2 - 150 + logo.get_height() / 2))
+    surface.blit(sub_logo, (WIDTH / 2 - (sub_logo.get_width() + version_text.get_width() + 20) / 2, HEIGHT / 2 - 50 + sub_logo.get_height() / 2))
+    surface.blit(version_text, (WIDTH / 2 - (sub_logo.get_width() + version_text.get_width() + 20) / 2 + sub_logo.get_width() + 20, HEIGHT / 2 - 46 + version_text.get_height() / 2))
+    return surface
+
+
+# The title screen, which only draws a button again when it is hovered over or no longer hovered over
+TITLE_SCREEN = CachedScreen(compose_title_screen)
+
+
+# Returns a function which renders the text of a button, and where to draw it centred at a height on the screen
+def title_button(text, px, y, color=WHITE):
+    def render():
+        rendered = render_text(text, px, color=color)
+        return rendered, (WIDTH / 2 - rendered.get_width() / 2, y(rendered))
+    return render
+
+
 # Draw window sized screen with a title and interactive buttons that enlarge when hovered over
-# Return the start and quit button rectangles to pass to the event checker
+# Return the start and quit button rectangles to pass to the event checker, and the areas of the window which changed
 def draw_title_screen(update_message):
 
-    # Background
-    WIN.blit(BACKGROUND, (0, 0))
-
     # Button rectangles
     update_box = pygame.Rect(10, 10, WIDTH, 40)
     start_button = pygame.Rect(WIDTH / 2 - 100, HEIGHT / 2 + 50, 200, 75)
     quit_button = pygame.Rect(WIDTH / 2 - 100, HEIGHT / 2 + 150, 200, 75)
 
-    # Font renders
-    logo = render_text("Athora", 60)
-    update_text = render_text(update_message, 11 if update_box.collidepoint(pygame.mouse.get_pos()) else 10, color=AQUA)
-    version_text = render_text(version, 12, color=YELLOW)
-    sub_logo = render_text("SpaceF Strikes Back", 15)
-    start_text = render_text("Play", 35 if start_button.collidepoint(pygame.mouse.get_pos()) else 30)
-    quit_text = render_text("Quit", 35 if quit_button.collidepoint(pygame.mouse.get_pos()) else 30)
+    # Font sizes, which are larger for the button the mouse is over
+    mouse = pygame.mouse.get_pos()
+    update_px = 11 if update_box.collidepoint(mouse) else 10
+    start_px = 35 if start_button.collidepoint(mouse) else 30
+    quit_px = 35 if quit_button.collidepoint(mouse) else 30
 
-    # Blit renders onto window
-    WIN.blit(update_text, (WIDTH / 2 - update_text.get_width() / 2, 10))
-    WIN.blit(logo, (WIDTH / 2 - logo.get_width() / 2, HEIGHT / 2 - 150 + logo.get_height() / 2))
-    WIN.blit(sub_logo, (WIDTH / 2 - (sub_logo.get_width() + version_text.get_width() + 20) / 2, HEIGHT / 2 - 50 + sub_logo.get_height() / 2))
-    WIN.blit(version_text, (WIDTH / 2 - (sub_logo.get_width() + version_text.get_width() + 20) / 2 + sub_logo.get_width() + 20, HEIGHT / 2 - 46 + version_text.get_height() / 2))
-    WIN.blit(start_text, (WIDTH / 2 - start_text.get_width() / 2, HEIGHT / 2 + 50 + start_text.get_height() / 2))
-    WIN.blit(quit_text, (WIDTH / 2 - quit_text.get_width() / 2, HEIGHT / 2 + 150 + quit_text.get_height() / 2))
+    # Only the buttons whose text or size changed are drawn again
+    dirty = TITLE_SCREEN.draw(WIN, {
+        'update': ((update_message, update_px), title_button(update_message, update_px, lambda text: 10, color=AQUA)),
+        'start': (start_px, title_button("Play", start_px, lambda text: HEIGHT / 2 + 50 + text.get_height() / 2)),
+        'quit': (quit_px, title_button("Quit", quit_px, lambda text: HEIGHT / 2 + 150 + text.get_height() / 2)),
+    })
 
-    return start_button, quit_button, update_box
+    return start_button, quit_button, update_box, dirty
 
 
-def main():
+# Run the game from the title screen until the player dies and restarts, or finishes the game
+# The player and levels are created once, and are reset before main is called again
+def main(player, levels):
 
     # Initialise pygame's clock and start the game loop
     clock = pygame.time.Clock()
@@ -267,36 +283,20 @@ def main():
     state = TITLE
     update_message = ""
 
-    # Check for updates from GitHub - if this version doesn't match the latest version
-    # If there is no internet, print error but run game
-    try:
-        response = requests.get("https://api.github.com/repos/Nulfy/Athora-SFSB/releases/latest", timeout=3)
-        if response.json()["tag_name"] != version:
-            update_message = "There is a new version available! Click here to download."
-    except requests.ConnectionError:
-        update_message = "Cannot check for updates."
-    except requests.Timeout:
-        update_message = "Cannot check for updates."
-
-    # Create a player and set a pygame constant
-    player = Player()
+    # Check for updates from GitHub in the background - if this version doesn't match the latest version
+    # If there is no internet, show an error but run game
+    UPDATE_CHECK.start()
+
+    # Set a pygame constant for the player
     pygame.player = player
 
     # Variables to hold damage state and elapsed frames
     damage = NONE
     damage_frames = 0
 
-    # Empty list and string to hold levels
-    levels = []
+    # Empty string to hold the title of the next level
     next_level_title = ""
 
-    # Serialize each level file into a Level object and append to a list
-    for index, level in enumerate(get_levels()):
-        levels.append(Level(f'Level {index + 1}', level))
-
-    # Turn the list into an object which holds series of levels
-    levels = Levels(levels, player)
-
     # Variables to hold interaction and sign state
     hovering: tuple[bool, InteractiveType | None] = (False, None)
     sign_status: tuple[bool, Sign | None] = (False, None)
@@ -310,21 +310,38 @@ def main():
     # Has the player won?
     win = False
 
-    while running:
+    # Time, in seconds, that has passed but the game hasn't been advanced through yet
+    accumulator = 0.0
+
+    # What the paused screen was showing when it was last drawn, or None if the screen is changing
+    paused_screen = None
 
-        # Limit the loop to run only 60 times per second
-        clock.tick(FPS)
+    # The title screen is drawn from scratch, as the game may have been drawn over it
+    TITLE_SCREEN.invalidate()
 
-        # Store the next level
-        next_level = levels.next()
+    while running:
+
+        # Limit the title screen to 60 frames per second, and draw the game as often as FRAME_LIMIT allows
+        # The time since the last frame decides how many steps the game is advanced by
+        frame_time = clock.tick(FPS if state == TITLE else FRAME_LIMIT) / 1000
 
         # Check if the game is in the TITLE SCREEN state
         if state == TITLE:
 
-            start_button, quit_button, update_box = draw_title_screen(update_message)
+            update_message = UPDATE_CHECK.message
+            start_button, quit_button, update_box, dirty = draw_title_screen(update_message)
+
+            # Load a few of the game's assets each frame while the title screen is shown,
+            # so that they are ready before the first level without delaying the title screen
+            loading = ASSETS.warm(2)
+
+            # Once nothing is changing or loading, wait for events instead of drawing the title screen again
+            events = get_events(not dirty and not loading)
+            if exposed(events):
+                TITLE_SCREEN.invalidate()
 
             # Iterate through pygame events
-            for event in pygame.event.get():
+            for event in events:
 
                 # Exit the program if the user quit
                 if event.type == pygame.QUIT:
@@ -344,10 +361,12 @@ def main():
                         state = CONTINUE
 
                     if update_box.collidepoint(event.pos):
-                        if update_message == "There is a new version available! Click here to download.":
+                        if update_message == UpdateChecker.NEW_VERSION:
                             webbrowser.open('https://github.com/Nulfy/Athora-SFSB/releases/latest', new=0)
 
-            pygame.display.update()
+            # Only push the parts of the title screen which changed to the display
+            if dirty:
+                pygame.display.update(dirty)
 
             continue
 
@@ -355,14 +374,32 @@ def main():
         current_level = levels.current
         pygame.level = current_level
 
+        # While a paused screen which isn't changing is shown, wait for events instead of drawing it again
+        # The time spent waiting is skipped, so the game doesn't try to catch up on it once it continues
+        idle = paused_screen is not None
+        events = get_events(idle)
+        if idle:
+            clock.tick()
+
+        # Start timing each phase of the frame, once any wait for events is over so that it isn't counted
+        PROFILER.begin_frame()
+
         # Iterate through pygame events
-        for event in pygame.event.get():
+        for event in events:
 
             # Exit the program if the user quit
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
 
+            # Show or hide the profiler if 'F3' is pressed, and save its timings to a CSV file if 'F4' is pressed
+            # The overlay shows where the timings were saved
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    PROFILER.toggle()
+                if event.key == pygame.K_F4:
+                    PROFILER.dump()
+
             # Check if the game is in the PAUSED state
             if state == PAUSED:
 
@@ -429,7 +466,7 @@ def main():
                 # Advance to the next level if a portal is entered
                 # If there is no next level, display a sign message
                 if event.type == ExitDoor.ENTER:
-                    if levels.next() is not None:
+                    if levels.has_next():
                         changing_levels = True
                         door = event.door
                         door.PORTAL_SOUND.play()
@@ -483,32 +520,105 @@ def main():
                 # Pass events to the player to handle player damage
                 player.process_event(event)
 
-        # Check if the game state is set to CONTINUE
-        if state == CONTINUE:
+        PROFILER.lap('events')
 
-            # Handle player movement
-            keys_pressed = pygame.key.get_pressed()
-            player.handle_movement(WIN, keys_pressed, current_level)
+        # Leave the paused screen as it is, unless the events changed what should be shown on it
+        # Nothing is drawn, so the frame isn't recorded by the profiler
+        if idle and paused_screen == (state, win, player.HEALTH, PROFILER.enabled) and not exposed(events):
+            continue
+        paused_screen = None
 
-            # Increment elapsed time by 1 every 60 frames
-            elapsed_time += 1 / FPS
+        # Advance the game in fixed steps, however long the last frame took to draw
+        # A slow frame runs more steps to catch up, but never more than MAX_STEPS, so that a hitch can't snowball
+        accumulator += min(frame_time, MAX_FRAME_TIME)
+        steps = 0
+        while accumulator >= STEP and steps < MAX_STEPS:
+            accumulator -= STEP
+            steps += 1
 
-            # Play background music if it isn't playing already
-            if not AMBIENCE_CHANNEL.get_busy():
-                AMBIENCE_CHANNEL.play(AMBIENCE)
+            # Get the current level, which may have changed in the previous step
+            current_level = levels.current
+            pygame.level = current_level
 
-        # If the music is playing outside the CONTINUE state, stop it
-        if state != CONTINUE:
-            if AMBIENCE_CHANNEL.get_busy():
-                AMBIENCE_CHANNEL.stop()
+            # Remember where everything was before this step, so that frames can be drawn between steps
+            current_level.save_positions()
 
-        draw_window(player, current_level, elapsed_time, state)
+            # Check if the game state is set to CONTINUE
+            if state == CONTINUE:
+
+                # Handle player movement, then advance everything else in the level
+                keys_pressed = pygame.key.get_pressed()
+                player.update(STEP, keys_pressed, current_level)
+                PROFILER.lap('player')
+                current_level.update(STEP)
+                PROFILER.lap('level')
+
+                # Increment elapsed time by 1 every 60 steps
+                elapsed_time += STEP
+
+            # Count how long the ammo popup has been shown for
+            if ammo_status[AMMO_PICKED]:
+                if ammo_status[AMMO_ELAPSED] < 120:
+                    ammo_status = (True, ammo_status[AMMO_EVENT], ammo_status[AMMO_ELAPSED] + 1)
+                else:
+                    ammo_status = (False, None, 0)
+
+            # Increment the damage frame counter if the player's health is changing
+            if damage != NONE:
+                damage_frames += 1
+
+            # Reset the damage frame counter and damage status if it goes over 30
+            if damage_frames > 30:
+                damage_frames = 0
+                damage = NONE
+
+            # Check if the game state is set to TRANSITIONING
+            if state == TRANSITION:
+
+                # If the animation is increasing, increment the transition frame counter
+                if changing_levels:
+                    if transition_frames == 0:
+                        next_level_title = levels.next_title()
+                    transition_frames += 2
+
+                # If the animation is decreasing, decrement the transition and text frame counter
+                # Once both counters are reset, set the game state back to CONTINUE
+                if not changing_levels:
+                    if transition_frames != 0:
+                        transition_frames -= 2
+                    if text_frames != 0:
+                        text_frames -= 4
+                    if transition_frames == 0 and text_frames == 0:
+                        state = CONTINUE
 
-        # Increment an enemy's alert timer if they are alerted
-        for enemy in levels.current.level_npc:
-            if isinstance(enemy, RobotEnemy):
-                if enemy.alerted:
-                    enemy.alerted_time += 1 / FPS
+                # If the transition is finished increasing, start decreasing it
+                # This also sets the current level to the next level
+                if transition_frames == 380:
+                    changing_levels = False
+                    levels + 1
+
+                # If the transition is almost opaque (alpha is ~250), start incrementing the text frame counter
+                if transition_frames > 250:
+                    text_frames += 4
+
+        # If the game fell too far behind, drop the steps it couldn't catch up on
+        if steps == MAX_STEPS:
+            accumulator = min(accumulator, STEP)
+
+        # Get the level to draw, and how far the game is between its last step and the next one
+        current_level = levels.current
+        pygame.level = current_level
+        current_level.camera.interpolate(accumulator / STEP)
+
+        # Play background music while the game is running, and stop it otherwise
+        if state == CONTINUE:
+            if not AMBIENCE_CHANNEL.get_busy():
+                AMBIENCE_CHANNEL.play(AMBIENCE.get())
+        elif AMBIENCE_CHANNEL.get_busy():
+            AMBIENCE_CHANNEL.stop()
+
+        draw_window(player, current_level, elapsed_time)
+        PROFILER.lap('draw')
 
         pending_reload = False
         # If a Gun in the player's inventory is empty, prompt them to reload
@@ -516,7 +626,7 @@ def main():
             if isinstance(item, Gun):
                 if item.EMPTY and player.inventory[player.inventory_selected_slot] == item:
                     if not item.reloading:
-                        draw_popup(item.RELOAD_TEXT, player)
+                        draw_popup(item.RELOAD_TEXT, player, current_level.camera)
                         pending_reload = True
 
         # Check if the player is hovering over an InteractiveType object
@@ -527,26 +637,14 @@ def main():
             hovering = (True, interactions[INTERACTING_WITH])
         else:
             hovering = (False, None)
+        PROFILER.lap('interactions')
 
         # If a sign is read by a player, draw it
         if sign_status[SIGN_OPEN]:
             draw_sign(sign_status[SIGN_OBJ].CONTENTS)
 
         if ammo_status[AMMO_PICKED]:
-            if ammo_status[AMMO_ELAPSED] <= 120:
-                draw_popup("+" + str(ammo_status[AMMO_EVENT].AMOUNT) + " ammo", player, color=GREEN)
-                ammo_status = (True, ammo_status[AMMO_EVENT], ammo_status[AMMO_ELAPSED] + 1)
-            else:
-                ammo_status = (False, None, 0)
-
-        # Increment the damage frame counter if the player's health is changing
-        if damage != NONE:
-            damage_frames += 1
-
-        # Reset the damage frame counter and damage status if it goes over 30
-        if damage_frames > 30:
-            damage_frames = 0
-            damage = NONE
+            draw_popup("+" + str(ammo_status[AMMO_EVENT].AMOUNT) + " ammo", player, current_level.camera, color=GREEN)
 
         # If the damage frame counter is incrementing, draw the damage animation
         if damage_frames > 0:
@@ -555,34 +653,9 @@ def main():
         # Check if the game state is set to TRANSITIONING
         if state == TRANSITION:
 
-            # If the animation is increasing, increment the transition frame counter
-            if changing_levels:
-                if transition_frames == 0:
-                    next_level_title = next_level.title
-                transition_frames += 2
-
-            # If the animation is decreasing, decrement the transition and text frame counter
-            # Once both counters are reset, set the game state back to CONTINUE
-            if not changing_levels:
-                if transition_frames != 0:
-                    transition_frames -= 2
-                if text_frames != 0:
-                    text_frames -= 4
-                if transition_frames == 0 and text_frames == 0:
-                    state = CONTINUE
-
-            # If the transition is finished increasing, start decreasing it
-            # This also sets the current level to the next level
-            if transition_frames == 380:
-                changing_levels = False
-                levels + 1
-
             # If the transition frame counter is increasing or decreasing, draw the animation
             if transition_frames > 0:
                 draw_transition(transition_frames)
-                # If the transition is almost opaque (alpha is ~250), start incrementing the text frame counter
-                if transition_frames > 250:
-                    text_frames += 4
 
             # Render text displaying the name of the next level at the opacity of the text frame counter
             text = render_text(next_level_title, 30, alpha=text_frames)
@@ -606,9 +679,30 @@ def main():
                                              f"\nTime: {str(datetime.timedelta(seconds=round(elapsed_time)))}"
                                              f"\nPress 'E' to continue")
 
+        # Draw the profiler's timings above everything else if it is shown
+        if PROFILER.enabled:
+            PROFILER.draw(WIN)
+        PROFILER.lap('overlays')
+
         pygame.display.update()
+        PROFILER.lap('display')
+
+        # Once the game is paused and the damage and ammo animations have finished, the screen stops changing
+        if state == PAUSED and damage_frames == 0 and not ammo_status[AMMO_PICKED]:
+            paused_screen = (state, win, player.HEALTH, PROFILER.enabled)
+        PROFILER.count(current_level)
+        PROFILER.end_frame()
 
 
 if __name__ == '__main__':
+
+    # Create a player, give each level file a title, and turn the list into an object which holds series of levels
+    # Only the first level is built now, and each following level is built in the background
+    game_player = Player()
+    game_levels = Levels([(f'Level {index + 1}', path) for index, path in enumerate(get_levels())], game_player)
+
+    # When the game ends, put the player and levels back the way they started instead of building them again
     while True:
-        main()
+        main(game_player, game_levels)
+        game_player.reset()
+        game_levels.reset()
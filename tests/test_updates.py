@@ -0,0 +1,89 @@
+import json
+import os.path
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from engine.updates import UpdateChecker
+
+
+# Stands in for the GitHub releases API, answering each path with a fixed status and body
+class ReleaseHandler(BaseHTTPRequestHandler):
+
+    RESPONSES = {
+        '/latest': (200, {'tag_name': 'v2.0'}),
+        '/limited': (403, {'message': 'API rate limit exceeded'}),
+    }
+
+    def do_GET(self):
+        status, body = self.RESPONSES.get(self.path, (404, {'message': 'Not Found'}))
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class UpdateCheckerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), ReleaseHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.directory.name, 'update_check.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # Run a check to completion on the current thread and return the checker
+    def check(self, path, version='v1.0'):
+        checker = UpdateChecker(version, url=self.base + path, cache_path=self.cache_path, timeout=5)
+        checker.check()
+        self.assertTrue(checker.done.is_set())
+        return checker
+
+    def test_new_release(self):
+        checker = self.check('/latest')
+        self.assertEqual(checker.message, UpdateChecker.NEW_VERSION)
+        with open(self.cache_path) as file:
+            self.assertEqual(json.load(file)['tag_name'], 'v2.0')
+
+    def test_latest_release(self):
+        self.assertEqual(self.check('/latest', version='v2.0').message, '')
+
+    def test_rate_limited(self):
+        checker = self.check('/limited')
+        self.assertEqual(checker.message, UpdateChecker.NO_CONNECTION)
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_cached_release(self):
+        with open(self.cache_path, 'w') as file:
+            json.dump({'checked': time.time(), 'tag_name': 'v1.0'}, file)
+        # The server would fail, so the result has to have come from the cache
+        self.assertEqual(self.check('/limited').message, '')
+
+    def test_malformed_cache(self):
+        for contents in ('{not json', '["v1.0"]', '{"checked": "yesterday", "tag_name": "v1.0"}'):
+            with self.subTest(contents=contents):
+                with open(self.cache_path, 'w') as file:
+                    file.write(contents)
+                self.assertEqual(self.check('/latest').message, UpdateChecker.NEW_VERSION)
+
+
+if __name__ == '__main__':
+    unittest.main()
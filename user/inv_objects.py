@@ -2,15 +2,16 @@ import os.path
 
 import pygame
 
-from world.npc import Bullet
+from engine.assets import Asset, Sound
+from engine.text import TEXT
+from engine.textures import TEXTURES
 
 WHITE = (255, 255, 255)
 
 
 # Returns a surface with text in the game font
 def render_text(text, px):
-    font = pygame.font.Font(os.path.join('assets', 'fonts', 'pressstart.ttf'), px)
-    return font.render(text, True, WHITE)
+    return TEXT.render(text, px, WHITE)
 
 
 # An object that can be held by the player in the inventory
@@ -26,8 +27,9 @@ class InventoryObject:
     def __init__(self, name, texture):
         self.NAME = name
         self.TEXTURE_FILE = texture
-        self.TEXTURE_IMG = pygame.image.load(os.path.join('assets', 'textures', 'items', texture)).convert_alpha()
-        self.TEXTURE = pygame.transform.scale(self.TEXTURE_IMG, (self.TEXTURE_WIDTH, self.TEXTURE_HEIGHT))
+        path = os.path.join('assets', 'textures', 'items', texture)
+        self.TEXTURE_IMG = TEXTURES.get(path)
+        self.TEXTURE = TEXTURES.get(path, (self.TEXTURE_WIDTH, self.TEXTURE_HEIGHT))
 
     # Draw the texture of the object at the coordinates of the slot it is in
     def draw(self, surface, index, slot):
@@ -36,6 +38,11 @@ class InventoryObject:
             name = render_text(self.NAME, 15)
             surface.blit(name, (slot[0] + 80 / 2 - name.get_width() / 2, slot[1] - 20))
 
+    # A method that is called every step of the game, dt seconds long, while the object is in the inventory
+    # Does nothing if this method isn't altered in the subclass
+    def update(self, dt):
+        pass
+
     # A method that is called when the object is used
     # Does nothing if this method isn't altered in the subclass
     def use(self):
@@ -49,7 +56,7 @@ class Potion(InventoryObject):
     TEXTURE = 'potion.png'
 
     # A sound that is played when the object is used
-    DRINK_SOUND = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'player', 'gulp.wav'))
+    DRINK_SOUND = Sound(os.path.join('assets', 'sounds', 'player', 'gulp.wav'))
 
     # An event that is called when the object is used, along with the amount of health points the player can gain from it
     DRINK = pygame.USEREVENT + 5
@@ -113,8 +120,8 @@ class Gun(InventoryObject):
 
     # Text that is shown and a sound that is played when it is reloaded
     RELOAD_TEXT: str
-    RELOAD_SOUND = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'player', 'reload.wav'))
-    RELOAD_CHANNEL = pygame.mixer.Channel(3)
+    RELOAD_SOUND = Sound(os.path.join('assets', 'sounds', 'player', 'reload.wav'))
+    RELOAD_CHANNEL = Asset(lambda: pygame.mixer.Channel(3))
 
     reloading = 0
 
@@ -130,6 +137,9 @@ class Gun(InventoryObject):
         super().draw(surface, index, slot)
         bullets = render_text(str(self.chamber), 15)
         surface.blit(bullets, (slot[0] + 70 - bullets.get_width(), slot[1] + 70 - bullets.get_height()))
+
+    # Prompt the player to reload once the chamber is empty, and top up the chamber once the reload sound has finished
+    def update(self, dt):
         if self.chamber == 0:
             if pygame.player.get_ammo() > 0:
                 self.RELOAD_TEXT = "'R' to reload"
@@ -167,7 +177,7 @@ class Gun(InventoryObject):
         if pygame.player.direction[pygame.player.RIGHT]:
             x = pygame.player.rect.x + pygame.player.rect.w
             direction = pygame.player.RIGHT
-        pygame.level.level_bullets.append(Bullet(x, y, direction, pygame.player))
+        pygame.level.level_bullets.fire(x, y, direction, pygame.player)
         self.chamber -= 1
 
     # Top up the chamber if it is empty, and play reload noise
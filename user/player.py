@@ -1,10 +1,12 @@
 import os.path
 import random
 
-import pygame.image
+import pygame
 
+from engine.assets import Asset, AssetList, Image, Sound, Sounds
+from engine.snapshot import Snapshot
 from user.inv_objects import Ammo
-from world.level_objects import CollideType, DroppedItem
+from world.level_objects import DroppedItem
 
 
 class Player:
@@ -25,38 +27,35 @@ class Player:
     PLAYER_WIDTH, PLAYER_HEIGHT = 32, 56
     SPAWN_X, SPAWN_Y = 0, 0
 
-    # All sprite images of the player
-    PLAYER_STILL = pygame.image.load(os.path.join('assets', 'sprites', 'player', 'hero_still.png')).convert_alpha()
-    PLAYER_WALK_1 = pygame.image.load(os.path.join('assets', 'sprites', 'player', 'hero_walk_1.png')).convert_alpha()
-    PLAYER_WALK_2 = pygame.image.load(os.path.join('assets', 'sprites', 'player', 'hero_walk_2.png')).convert_alpha()
+    # All sprite images of the player, which are loaded the first time they are drawn
+    PLAYER_STILL = os.path.join('assets', 'sprites', 'player', 'hero_still.png')
+    PLAYER_WALK_1 = os.path.join('assets', 'sprites', 'player', 'hero_walk_1.png')
+    PLAYER_WALK_2 = os.path.join('assets', 'sprites', 'player', 'hero_walk_2.png')
 
-    PLAYER_LEFT = pygame.transform.scale(PLAYER_STILL, (PLAYER_WIDTH, PLAYER_HEIGHT))
-    PLAYER_LEFT_WALK_1 = pygame.transform.scale(PLAYER_WALK_1, (PLAYER_WIDTH, PLAYER_HEIGHT))
-    PLAYER_LEFT_WALK_2 = pygame.transform.scale(PLAYER_WALK_2, (PLAYER_WIDTH, PLAYER_HEIGHT))
+    PLAYER_LEFT = Image(PLAYER_STILL, (PLAYER_WIDTH, PLAYER_HEIGHT))
+    PLAYER_LEFT_WALK_1 = Image(PLAYER_WALK_1, (PLAYER_WIDTH, PLAYER_HEIGHT))
+    PLAYER_LEFT_WALK_2 = Image(PLAYER_WALK_2, (PLAYER_WIDTH, PLAYER_HEIGHT))
 
-    PLAYER_RIGHT = pygame.transform.flip(PLAYER_LEFT, True, False)
-    PLAYER_RIGHT_WALK_1 = pygame.transform.flip(PLAYER_LEFT_WALK_1, True, False)
-    PLAYER_RIGHT_WALK_2 = pygame.transform.flip(PLAYER_LEFT_WALK_2, True, False)
+    PLAYER_RIGHT = Image(PLAYER_STILL, (PLAYER_WIDTH, PLAYER_HEIGHT), flip=True)
+    PLAYER_RIGHT_WALK_1 = Image(PLAYER_WALK_1, (PLAYER_WIDTH, PLAYER_HEIGHT), flip=True)
+    PLAYER_RIGHT_WALK_2 = Image(PLAYER_WALK_2, (PLAYER_WIDTH, PLAYER_HEIGHT), flip=True)
 
-    PLAYER_LEFT_WALKING = [PLAYER_LEFT_WALK_1, PLAYER_LEFT, PLAYER_LEFT_WALK_2, PLAYER_LEFT]
-    PLAYER_RIGHT_WALKING = [PLAYER_RIGHT_WALK_1, PLAYER_RIGHT, PLAYER_RIGHT_WALK_2, PLAYER_RIGHT]
+    PLAYER_LEFT_WALKING = AssetList(PLAYER_LEFT_WALK_1, PLAYER_LEFT, PLAYER_LEFT_WALK_2, PLAYER_LEFT)
+    PLAYER_RIGHT_WALKING = AssetList(PLAYER_RIGHT_WALK_1, PLAYER_RIGHT, PLAYER_RIGHT_WALK_2, PLAYER_RIGHT)
     ANIMATION_SPEED = 15
     animation_frame_count = 0
 
     # All sound effects made by the player
-    JUMP_NOISE_CHANNEL = pygame.mixer.Channel(4)
-    JUMP_NOISE = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'player', 'jump.wav'))
-    COLLECT_NOISE = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'player', 'collect.wav'))
-    DEATH_NOISE = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'player', 'death.flac'))
+    JUMP_NOISE_CHANNEL = Asset(lambda: pygame.mixer.Channel(4))
+    JUMP_NOISE = Sound(os.path.join('assets', 'sounds', 'player', 'jump.wav'))
+    COLLECT_NOISE = Sound(os.path.join('assets', 'sounds', 'player', 'collect.wav'))
+    DEATH_NOISE = Sound(os.path.join('assets', 'sounds', 'player', 'death.flac'))
 
     # Load images of hearts to show player health in game
     HEART_WIDTH, HEART_HEIGHT = 36, 36
 
-    FULL_HEART_IMG = pygame.image.load(os.path.join('assets', 'textures', 'player', 'full_heart.png')).convert_alpha()
-    EMPTY_HEART_IMG = pygame.image.load(os.path.join('assets', 'textures', 'player', 'empty_heart.png')).convert_alpha()
-
-    FULL_HEART = pygame.transform.scale(FULL_HEART_IMG, (HEART_WIDTH, HEART_HEIGHT))
-    EMPTY_HEART = pygame.transform.scale(EMPTY_HEART_IMG, (HEART_WIDTH, HEART_HEIGHT))
+    FULL_HEART = Image(os.path.join('assets', 'textures', 'player', 'full_heart.png'), (HEART_WIDTH, HEART_HEIGHT))
+    EMPTY_HEART = Image(os.path.join('assets', 'textures', 'player', 'empty_heart.png'), (HEART_WIDTH, HEART_HEIGHT))
 
     # A rectangle to surround the player, and the current sprite being drawn
     rect: pygame.Rect
@@ -64,8 +63,8 @@ class Player:
 
     # A list of sounds played in a random order when damage is taken,
     # and a custom sound channel so that only one sound is played per damage tick
-    DAMAGE_NOISES: list
-    DAMAGE_CHANNEL = pygame.mixer.Channel(5)
+    DAMAGE_NOISES = Sounds(os.path.join('assets', 'sounds', 'player', 'damage'), '.flac')
+    DAMAGE_CHANNEL = Asset(lambda: pygame.mixer.Channel(5))
 
     # Enum values for the player's direction
     RIGHT, LEFT, UP, DOWN = 0, 1, 2, 3
@@ -86,9 +85,8 @@ class Player:
     # All images and variables for the player's inventory
     INVENTORY_SIZE = 2
     INVENTORY_SLOT_SIZE = INVENTORY_SLOT_WIDTH, INVENTORY_SLOT_HEIGHT = 80, 80
-    INVENTORY_SLOT_IMG = pygame.image.load(os.path.join('assets', 'textures', 'player', 'inventory_slot.png')).convert_alpha()
-    INVENTORY_SLOT_SELECT = pygame.image.load(os.path.join('assets', 'textures', 'player', 'inventory_select.png')).convert_alpha()
-    INVENTORY_SLOT = pygame.transform.scale(INVENTORY_SLOT_IMG, INVENTORY_SLOT_SIZE)
+    INVENTORY_SLOT_SELECT = Image(os.path.join('assets', 'textures', 'player', 'inventory_select.png'))
+    INVENTORY_SLOT = Image(os.path.join('assets', 'textures', 'player', 'inventory_slot.png'), INVENTORY_SLOT_SIZE)
     inventory: list
     inventory_selected_slot = 0
 
@@ -103,17 +101,12 @@ class Player:
         self.rect = pygame.Rect(self.SPAWN_X, self.SPAWN_Y, self.PLAYER_WIDTH, self.PLAYER_HEIGHT)
         self.current_img = self.PLAYER_RIGHT
         self.inventory = [None, None]
-        self.init_damage_sounds()
         self.ammo = 6
+        self.pristine = Snapshot(self, exclude=('pristine',))
 
-    # Load all sounds that can be played while taking damage
-    def init_damage_sounds(self):
-        self.DAMAGE_NOISES = []
-        sound_dir = os.path.join('assets', 'sounds', 'player', 'damage')
-        sound_files = [f for f in os.listdir(sound_dir)
-                       if os.path.isfile(os.path.join(sound_dir, f)) and f.lower().endswith(".flac")]
-        for sound in sound_files:
-            self.DAMAGE_NOISES.append(pygame.mixer.Sound(os.path.join(sound_dir, sound)))
+    # Put the player back in the state they were created in, with full health and an empty inventory
+    def reset(self):
+        self.pristine.restore()
 
     # Return a random sound in the damage noise list
     def play_damage_sound(self):
@@ -132,7 +125,7 @@ class Player:
         self.ammo += amt
 
     # Change the rect position of the player based on gravity and keyboard inputs
-    def handle_movement(self, window, keys_pressed, level):
+    def handle_movement(self, keys_pressed, level):
         self.prev_pos_x = self.rect.x
         self.prev_pos_y = self.rect.y
         x_change = 0
@@ -179,30 +172,13 @@ class Player:
                 self.direction = (True, False, False, False)
                 x_change += self.VELOCITY
 
-        # If the player moves 3/4 across the screen, both vertically and horizontally,
-        # cancel movement and move the map instead to create a scrolling effect
-        if x_change != 0:
-            if self.rect.x + x_change > window.get_width() * 0.75:
-                level.scroll(-self.VELOCITY, 0)
-                x_change = 0
-                self.prev_pos_x -= 1
-            if self.rect.x + x_change < window.get_width() * 0.25:
-                level.scroll(self.VELOCITY, 0)
-                x_change = 0
-                self.prev_pos_x += 1
-
-        if self.rect.y + y_change < window.get_height() * 0.25:
-            level.scroll(0, self.GRAVITY)
-            y_change = 0
-            self.prev_pos_y += self.GRAVITY
-        if self.rect.y + self.rect.h + y_change > window.get_height() * 0.75:
-            y_change = -self.nearest_grav
-            level.scroll(0, -self.nearest_grav)
-            self.prev_pos_y -= self.nearest_grav
-
         self.rect.x += x_change
         self.rect.y += y_change
 
+        # If the player moves 3/4 across the screen, both vertically and horizontally,
+        # move the camera with them to create a scrolling effect
+        level.camera.follow(self.rect, x_change, y_change)
+
     # Returns a tuple in form (bool, int) where the boolean indicates if the player is moving
     # If they are, the second element indicates in which direction, as an enum
     def moving(self):
@@ -229,14 +205,7 @@ class Player:
     # Check if the Player is going to collide with a CollideType
     def check_collision(self, level, change):
         potential_rect = pygame.Rect(change[0], change[1], self.PLAYER_WIDTH, self.PLAYER_HEIGHT)
-        for level_object in level.level_objects:
-            if isinstance(level_object, CollideType):
-                if level_object.rect.colliderect(potential_rect):
-                    return True
-        for npc in level.level_npc:
-            if npc.rect.colliderect(potential_rect):
-                return True
-        return False
+        return level.collides(potential_rect) or level.npc_index.any(potential_rect)
 
     # If the event passed indicates that the player took damage, alter health accordingly
     def process_event(self, event):
@@ -270,7 +239,7 @@ class Player:
         where = self.inventory_selected_slot if where is None else where
         self.inventory[where] = item.INV_OBJECT
         self.COLLECT_NOISE.play()
-        pygame.level.level_objects.remove(item)
+        pygame.level.remove_object(item)
 
     # Add an item to the player's inventory to the next free slot
     # If there is no free slot, the current item is dropped and new one is put in its place
@@ -279,7 +248,7 @@ class Player:
             item.INV_OBJECT.use()
             self.add_ammo(item.INV_OBJECT.AMOUNT)
             self.COLLECT_NOISE.play()
-            pygame.level.level_objects.remove(item)
+            pygame.level.remove_object(item)
             return
         x = 0
         if self.direction[self.RIGHT]:
@@ -292,7 +261,7 @@ class Player:
                 dropped_current_item = DroppedItem(x/DroppedItem.OBJECT_WIDTH,
                                                    self.rect.y/DroppedItem.OBJECT_HEIGHT, current_item)
                 self.pickup(item)
-                pygame.level.level_objects.append(dropped_current_item)
+                pygame.level.add_object(dropped_current_item)
             else:
                 self.pickup(item, where=1 - self.inventory_selected_slot)
                 self.inventory_selected_slot = 1 - self.inventory_selected_slot
@@ -310,12 +279,20 @@ class Player:
                 x = self.rect.x - self.rect.width
             dropped_current_item = DroppedItem(x/DroppedItem.OBJECT_WIDTH,
                                                self.rect.y/DroppedItem.OBJECT_HEIGHT, current_item)
-            pygame.level.level_objects.append(dropped_current_item)
+            pygame.level.add_object(dropped_current_item)
             self.inventory[self.inventory_selected_slot] = None
 
-    # Draw the player onto the window surface
-    def draw(self, surface):
-        # Player Walking Animation
+    # Advance the player by one step of the game, dt seconds long
+    # Moves the player, picks the next frame of their animation and updates the items in their inventory
+    def update(self, dt, keys_pressed, level):
+        self.handle_movement(keys_pressed, level)
+        self.animate()
+        for item in self.inventory:
+            if item is not None:
+                item.update(dt)
+
+    # Player Walking Animation
+    def animate(self):
         if self.moving()[0]:
             self.walking_animation(self.RIGHT, self.PLAYER_RIGHT_WALKING)
             self.walking_animation(self.LEFT, self.PLAYER_LEFT_WALKING)
@@ -326,7 +303,10 @@ class Player:
                 self.current_img = self.PLAYER_RIGHT
             if self.direction[self.LEFT]:
                 self.current_img = self.PLAYER_LEFT
-        surface.blit(self.current_img, (self.rect.x, self.rect.y))
+
+    # Draw the player onto the window surface, relative to the camera
+    def draw(self, surface, camera):
+        surface.blit(self.current_img, camera.project(self.rect))
         # Player Hearts
         last_heart = 5
         for heart in range(self.HEALTH):
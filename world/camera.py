@@ -0,0 +1,96 @@
+import pygame
+
+
+# The view into a level, holding how far it has scrolled from the level's origin
+# Everything in the level keeps its world coordinates, and the camera offset is only applied when drawing
+class Camera:
+
+    # Dimensions of the viewport in pixels
+    WIDTH, HEIGHT = 832, 640
+
+    # Portion of the viewport the player can move within before the camera follows them
+    LOWER_BOUND, UPPER_BOUND = 0.25, 0.75
+
+    # Position of the top left corner of the viewport in the level
+    x: int
+    y: int
+
+    # Where the viewport and moving rectangles were before the latest step of the game, and how far
+    # through the next step the frame being drawn is, from 0 (where they were) to 1 (where they are now)
+    # Saved rectangles are keyed by their id, and the viewport has no saved position until the first step
+    saved: dict
+    previous: tuple | None
+    alpha: float
+
+    def __init__(self, x=0, y=0, width=WIDTH, height=HEIGHT):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.saved = {}
+        self.previous = None
+        self.alpha = 1.0
+
+    # Returns the position on the screen of a rectangle in the level
+    def apply(self, rect):
+        return rect.x - self.x, rect.y - self.y
+
+    # Save the position of the viewport and some rectangles before a step of the game moves them
+    def save(self, rects):
+        self.saved = {id(rect): (rect, rect.x, rect.y) for rect in rects}
+        self.previous = (self.x, self.y)
+
+    def interpolate(self, alpha):
+        self.alpha = alpha
+
+    # Returns the position of the top left corner of the viewport in the frame being drawn
+    def offset(self):
+        if self.previous is None:
+            return self.x, self.y
+        previous_x, previous_y = self.previous
+        return (round(previous_x + (self.x - previous_x) * self.alpha),
+                round(previous_y + (self.y - previous_y) * self.alpha))
+
+    # Returns the position on the screen to draw a rectangle at in the frame being drawn
+    # Saved rectangles are drawn part way between where they were before the latest step and where they are now,
+    # so that movement is smooth when frames are drawn more often than the game steps
+    def project(self, rect):
+        x, y = rect.x, rect.y
+        saved = self.saved.get(id(rect))
+        if saved is not None and saved[0] is rect:
+            x = saved[1] + (x - saved[1]) * self.alpha
+            y = saved[2] + (y - saved[2]) * self.alpha
+        left, top = self.offset()
+        return round(x - left), round(y - top)
+
+    # Move the viewport by a number of pixels
+    def move(self, x, y):
+        self.x += x
+        self.y += y
+
+    # Returns a rectangle covering the part of the level that is in the viewport
+    def view(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    # Move the viewport along with a rectangle that just moved by (x_change, y_change)
+    # if the move took it more than 3/4 across the screen, both vertically and horizontally
+    def follow(self, rect, x_change, y_change):
+        screen_x, screen_y = self.apply(rect)
+        if x_change > 0:
+            self.x += self.catch_up(screen_x - int(self.width * self.UPPER_BOUND), x_change)
+        if x_change < 0:
+            self.x -= self.catch_up(int(self.width * self.LOWER_BOUND) - screen_x, -x_change)
+        if y_change > 0:
+            self.y += self.catch_up(screen_y + rect.height - int(self.height * self.UPPER_BOUND), y_change)
+        if y_change < 0:
+            self.y -= self.catch_up(int(self.height * self.LOWER_BOUND) - screen_y, -y_change)
+
+    # Returns how far the viewport should move towards a rectangle which is 'overshoot' pixels past the edge
+    # of the area it can move within, which is at most twice the distance the rectangle moved
+    # Moving faster than the rectangle lets the viewport close a gap it started with, such as when the player spawns
+    # past the edge of the area, instead of trailing behind by the same distance for as long as the player keeps moving
+    @staticmethod
+    def catch_up(overshoot, change):
+        if overshoot <= 0:
+            return 0
+        return min(overshoot, change * 2)
@@ -0,0 +1,103 @@
+import json
+import os.path
+
+from user.inv_objects import Potion, Gun, MagentaCartridge, Ammo
+from world import tiles
+from world.level_objects import ExitDoor, ExitHelicopter, DroppedItem, Sign, Printer, Lava
+from world.npc import RobotEnemy, RobotBoss
+from world.tiles import TileType, TILE_SIZE
+
+# Names that entries in the legend file can use for tiles, objects, NPCs and inventory items
+TILES = {name: tile for name, tile in vars(tiles).items() if isinstance(tile, TileType)}
+OBJECTS = {cls.__name__: cls for cls in (ExitDoor, ExitHelicopter, DroppedItem, Sign, Printer, Lava)}
+NPCS = {cls.__name__: cls for cls in (RobotEnemy, RobotBoss)}
+ITEMS = {cls.__name__: cls for cls in (Potion, Gun, MagentaCartridge, Ammo)}
+
+
+# What a single character in a level file creates: a tile, an object, an NPC, or a combination of these
+class LegendEntry:
+
+    char: str
+
+    # The id of the tile placed in the cell, or 0 if the cell has no tile
+    tile_id: int
+
+    # If the player spawns in this cell
+    spawn: bool
+
+    def __init__(self, char, spec):
+        self.char = char
+        self.spec = spec
+        self.tile_id = 0
+        self.spawn = spec.get('spawn', False)
+        self.object_type = None
+        self.npc_type = None
+        if 'tile' in spec:
+            self.tile_id = self.lookup(TILES, spec['tile'], 'tile').id
+        if 'object' in spec:
+            self.object_type = self.lookup(OBJECTS, spec['object'], 'object')
+        if 'npc' in spec:
+            self.npc_type = self.lookup(NPCS, spec['npc'], 'NPC')
+        self.item = self.item_factory(spec['item']) if 'item' in spec else None
+        self.inventory = [self.item_factory(item) for item in spec.get('inventory', ())]
+
+    def lookup(self, table, name, kind):
+        if name not in table:
+            raise ValueError(f"Legend entry '{self.char}' uses unknown {kind} '{name}'")
+        return table[name]
+
+    # Returns a function creating a new inventory item from a list holding its name and arguments
+    def item_factory(self, item):
+        cls = self.lookup(ITEMS, item[0], 'item')
+        args = item[1:]
+        return lambda: cls(*args)
+
+    # Returns a new object for the cell at (column, row), or None if this entry has no object
+    def create_object(self, column, row):
+        if self.object_type is None:
+            return None
+        if self.item is not None:
+            return self.object_type(column, row, self.item())
+        if 'text' in self.spec:
+            return self.object_type(column, row, self.spec['text'])
+        return self.object_type(column, row)
+
+    # Returns a new NPC standing in the cell at (column, row), or None if this entry has no NPC
+    def create_npc(self, column, row):
+        if self.npc_type is None:
+            return None
+        kwargs = {'inventory': [item() for item in self.inventory]}
+        if 'health' in self.spec:
+            kwargs['health'] = self.spec['health']
+        return self.npc_type(column * TILE_SIZE, row * TILE_SIZE, **kwargs)
+
+
+# The table of every character that can be used in a level file, loaded from the legend file
+class Legend:
+
+    PATH = os.path.join('assets', 'legend.json')
+
+    # Entries keyed by the character they are for
+    entries: dict
+
+    # The legend loaded from the default path, shared by every level
+    default = None
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    @classmethod
+    def load(cls, path=PATH):
+        with open(path, 'r', encoding='utf-8') as file:
+            specs = json.load(file)
+        return cls({char: LegendEntry(char, spec) for char, spec in specs.items()})
+
+    # Returns the legend shared by every level, loading it the first time it is used
+    @classmethod
+    def get_default(cls):
+        if cls.default is None:
+            cls.default = cls.load()
+        return cls.default
+
+    def get(self, char):
+        return self.entries.get(char)
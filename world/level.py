@@ -1,20 +1,87 @@
-from user.inv_objects import Potion, Gun, MagentaCartridge, Ammo
+import re
+import threading
+import time
+
+import pygame
+
+from engine.snapshot import Snapshot
+from engine.textures import TEXTURES
 from user.player import Player
-from world.level_objects import ObjectType, Background, Wall, ExitDoor, Air, Barrier, Grass, Dirt, DroppedItem, Sign, \
-    Lava, ExitHelicopter, StairLeft, StairRight, Printer, Board, Water, Glass, DirtBkg, Bush, Tree, Sand, BuildingBkg1,\
-    BuildingBkg2
-from world.npc import RobotEnemy, NPC, Bullet, RobotBoss
+from world import level_file, tiles
+from world.camera import Camera
+from world.legend import Legend
+from world.level_file import CompiledLevel
+from world.level_objects import ObjectType, CollideType, Air, DroppedItem
+from world.npc import NPC, Bullet, BulletPool
+from world.physics import Body
+from world.scheduler import NPCScheduler
+from world.spatial import SpatialHash
+from world.tiles import TILE_SIZE, TILE_TYPES, SOLID_TILES
+
+# Matches each run of characters in a line of a level file which are not blank
+NON_BLANK = re.compile(r'\S+')
+
+# Levels with more columns than this are streamed in strips rather than built all at once
+STREAM_COLUMNS = 1024
 
 
 class Level:
 
-    # The string layout pulled from the level file
-    layout: str
+    # The string layout pulled from the level file, or the compiled level it was loaded from
+    # Released levels drop their layout, closing the file of a compiled level
+    layout: str | CompiledLevel | None
+
+    # Static tiles, stored as one tile id per cell in row order, and the number of columns and rows in the grid
+    # Ids index into the tile type table, and 0 is an empty cell
+    # The grid is never changed once the level is built, so restarting the level leaves it alone
+    # Compiled levels use a view of the mapped file as their grid
+    tiles: bytes | memoryview
+    columns: int
+    rows: int
 
     # Objects, NPCs and Bullets within the level
+    # Objects are drawn above the static tiles every frame
     level_objects: list[ObjectType]
     level_npc: list[NPC]
-    level_bullets: list[Bullet]
+    level_bullets: BulletPool
+
+    # Index of every CollideType object in the level, used to only test collisions against nearby objects
+    # NPCs have their own index, which is kept up to date as they move, used to find what bullets hit
+    # Every object is also indexed by the area it covers, used to find the objects in the viewport
+    collision_index: SpatialHash
+    npc_index: SpatialHash
+    object_index: SpatialHash
+
+    # Cells holding tiles which are drawn larger than a cell, like trees and buildings, listed for each chunk
+    # of the level their image overlaps, so drawing the tiles in the viewport never looks at cells outside of it
+    overlaps: dict
+
+    # Index of every NPC and dropped item which has landed and is resting, used to wake the ones resting on an
+    # object when it is removed
+    resting: SpatialHash
+
+    # Decides which NPCs are updated each step of the game
+    scheduler: NPCScheduler
+
+    # NPCs are spread thinly and looked up over large areas, so their index uses bigger cells than the collision index
+    # Objects are looked up over the area of the viewport
+    NPC_CELL_SIZE = 512
+    OBJECT_CELL_SIZE = 256
+
+    # How far outside the viewport bodies have their positions saved, so that bodies are still drawn smoothly
+    # when the camera moves during a step
+    SAVE_MARGIN = 128
+
+    # Static tiles are baked into square chunk surfaces keyed by their (column, row) in the chunk grid
+    CHUNK_SIZE = 256
+    chunks: dict
+    bake_static: bool
+
+    # The view into the level, everything else in the level keeps its world position
+    camera: Camera
+
+    # How many objects were visible in the viewport when the level was last drawn
+    visible: int
 
     # The point in the level where the player will spawn
     spawn_point: ObjectType
@@ -22,185 +89,731 @@ class Level:
     # Name of the level
     title: str
 
-    def __init__(self, title, layout):
-        split_layout = layout.split("\n")
+    # The legend used to turn characters in the layout into tiles, objects and NPCs
+    legend: Legend
 
+    # How long the layout took to parse, in seconds, and how many tiles, objects and NPCs it created
+    stats: dict
+
+    # The level as it was built, which it is put back to when the game is restarted
+    # Only the entities are recorded, the tile grid is kept as it was parsed
+    pristine_objects: list[ObjectType]
+    pristine_npc: list[NPC]
+    snapshots: list[Snapshot]
+
+    # Build a level from its layout, which is either the text of a level file or a compiled level
+    def __init__(self, title, layout, bake_static=True, legend=None):
+        started = time.perf_counter()
         self.title = title
         self.layout = layout
         self.level_objects = []
         self.level_npc = []
-        self.level_bullets = []
-
-        # Characters which correspond to different level objects
-        # If the character is present, the object will be added to the level at that position
-        for line_index, line in enumerate(split_layout):
-            for char_index, char in enumerate(line):
-                if char == "-":
-                    self.level_objects.append(Background(char_index, line_index))
-                if char == "~":
-                    self.level_objects.append(Water(char_index, line_index))
-                if char == "W":
-                    self.level_objects.append(Wall(char_index, line_index))
-                if char == "S":
-                    spawn = Air(char_index, line_index)
-                    self.spawn_point = spawn
-                    self.level_objects.append(spawn)
-                if char == "T":
-                    self.level_objects.append(ExitDoor(char_index, line_index))
-                if char == "H":
-                    self.level_objects.append(DroppedItem(char_index, line_index, Potion(10)))
-                if char == "P":
-                    self.level_objects.append(DroppedItem(char_index, line_index, Gun()))
-                if char == "B":
-                    self.level_objects.append(Barrier(char_index, line_index))
-                if char == "G":
-                    self.level_objects.append(Grass(char_index, line_index))
-                if char == "D":
-                    self.level_objects.append(Dirt(char_index, line_index))
-                if char == "s":
-                    self.level_objects.append(DirtBkg(char_index, line_index))
-                if char == "I":
-                    self.level_objects.append(StairLeft(char_index, line_index))
-                if char == "J":
-                    self.level_objects.append(StairRight(char_index, line_index))
-                if char == "g":
-                    self.level_objects.append(Glass(char_index, line_index))
-                if char == "m":
-                    self.level_objects.append(Bush(char_index, line_index))
-                if char == "v":
-                    self.level_objects.append(Sand(char_index, line_index))
-                if char == "j":
-                    self.level_objects.append(Tree(char_index, line_index))
-                if char == ":":
-                    self.level_objects.append(StairLeft(char_index, line_index))
-                if char == ";":
-                    self.level_objects.append(StairRight(char_index, line_index))
-                if char == "L":
-                    self.level_objects.append(Lava(char_index, line_index))
-                if char == "A":
-                    self.level_objects.append(Board(char_index, line_index))
-                if char == "E":
-                    self.level_npc.append(RobotEnemy(char_index * 32, line_index * 32, inventory=[Potion(1), Ammo(20)]))
-                if char == "d":
-                    self.level_npc.append(RobotEnemy(char_index * 32, line_index * 32, inventory=[Potion(1), Ammo(20)]))
-                    self.level_objects.append(DirtBkg(char_index, line_index))
-                if char == "R":
-                    self.level_npc.append(RobotEnemy(char_index * 32, line_index * 32, health=3, inventory=[Ammo()]))
-                if char == "<":
-                    self.level_objects.append(BuildingBkg1(char_index, line_index))
-                    self.level_objects.append(Wall(char_index, line_index))
-                if char == ">":
-                    self.level_objects.append(BuildingBkg2(char_index, line_index))
-                    self.level_objects.append(Wall(char_index, line_index))
-                if char == "n":
-                    self.level_objects.append(Background(char_index, line_index))
-                    self.level_npc.append(RobotBoss(char_index * 32, line_index * 32, health=30, inventory=[MagentaCartridge()]))
-                if char == "O":
-                    self.level_objects.append(Printer(char_index, line_index,
-                                                 "Black: 0%  Yellow: 0%\nCyan: 0%  Magenta: 100%\nFewlett Packard"))
-                if char == "!":
-                    self.level_objects.append(Sign(char_index, line_index,
-                                                 "Welcome to Athora!\nPress 'A' & 'D' or '←' & '→'\nto move!"))
-                if char == "@":
-                    self.level_objects.append(Sign(char_index, line_index,
-                                                 "Excellent work! Try jumping\nover this wall by pressing\n'SPACE'!"))
-                if char == "#":
-                    self.level_objects.append(Sign(char_index, line_index,
-                                                 "Nice! Here, take this gun.\nTry shooting this robot\nby pressing 'M'!"))
-                if char == "$":
-                    self.level_objects.append(Sign(char_index, line_index,
-                                                 "Whew, that was close! This\npotion will heal you up.\nPress 'M' to use."))
-                if char == "%":
-                    self.level_objects.append(Sign(char_index, line_index,
-                                                 "Use '1' and '2' to switch\nbetween your inventory\nslots!"))
-                if char == "^":
-                    self.level_objects.append(Sign(char_index, line_index,
-                                                 "Good job finishing the\ntutorial. Enter this portal\nto begin your journey!"))
-                if char == "&":
-                    self.level_objects.append(Sign(char_index, line_index,
-                                                 "Welcome back.\nYour conscience has been \nbothering you for a while."))
-                if char == "*":
-                    self.level_objects.append(Sign(char_index, line_index,
-                                                 "Figure out what's\ngoing on here.\nGood luck"))
-                if char == "(":
-                    self.level_objects.append(Sign(char_index, line_index,
-                                                 "Look out\nthere are guards ahead."))
-                if char == ")":
-                    self.level_objects.append(Sign(char_index,line_index,
-                                                   "Self flying helicopter\nPre-production unit\nAuthorised personnel only"))
-                if char == "o":
-                    self.level_objects.append(Sign(char_index,line_index,
-                                                   "Welcome to SpaceF\nleading in innovation\nas the only company."))
-                if char == "C":
-                    self.level_objects.append(ExitHelicopter(char_index, line_index))
-                if char == "p":
-                    self.level_objects.append(DirtBkg(char_index, line_index))
-                    self.level_objects.append(Sign(char_index, line_index,
-                                                 "You dare use the\nsecret tunnel\nMeant for Felon himself?"))
-
-    # Call the draw function of every object and NPC within the map, given it is currently visible in the game's viewport
-    def draw(self, surface):
+        self.level_bullets = BulletPool()
+        self.chunks = {}
+        self.bake_static = bake_static
+        self.legend = Legend.get_default() if legend is None else legend
+        self.camera = Camera()
+        self.scheduler = NPCScheduler(self)
+        self.visible = 0
+
+        if isinstance(layout, CompiledLevel):
+            counts, entities = self.load(layout)
+        else:
+            counts, entities = self.parse(layout)
+        self.populate(entities)
+        self.index_overlaps()
+
+        self.stats = {'parse_time': time.perf_counter() - started, 'tiles': counts['tiles'],
+                      'objects': len(self.level_objects), 'npcs': len(self.level_npc), 'unknown': counts['unknown']}
+
+        self.snapshot()
+        self.index_collisions()
+        if self.bake_static:
+            self.bake()
+
+    # Build the tile grid and entities from the text of a level file
+    # Characters which correspond to different tiles, level objects and NPCs are looked up in the legend
+    # Runs of blank cells are skipped over without looking each one up
+    # Returns how many tiles were placed and how many characters weren't in the legend,
+    # as well as the column, row and legend entry of every object and NPC in the layout
+    def parse(self, layout):
+        split_layout = layout.split("\n")
+        self.rows = len(split_layout)
+        self.columns = max(len(line) for line in split_layout)
+        self.tiles = bytearray(self.columns * self.rows)
+        entries = self.legend.entries
+        counts = {'tiles': 0, 'unknown': 0}
+        entities = []
+        for row, line in enumerate(split_layout):
+            start = row * self.columns
+            for run in NON_BLANK.finditer(line):
+                for column, char in enumerate(run.group(), run.start()):
+                    entry = entries.get(char)
+                    if entry is None:
+                        counts['unknown'] += 1
+                        continue
+                    if entry.tile_id:
+                        self.tiles[start + column] = entry.tile_id
+                        counts['tiles'] += 1
+                    if entry.spawn:
+                        self.spawn_point = Air(column, row)
+                    if entry.object_type is not None or entry.npc_type is not None:
+                        entities.append((column, row, entry))
+        self.tiles = bytes(self.tiles)
+        return counts, entities
+
+    # Use the tile grid of a compiled level as it is mapped from the disk, and read where its entities are
+    # Compiled levels were checked when they were compiled, so every cell is known
+    def load(self, compiled):
+        self.columns, self.rows = compiled.columns, compiled.rows
+        self.tiles = compiled.tiles
+        self.spawn_point = Air(*compiled.spawn)
+        return {'tiles': compiled.tile_count, 'unknown': 0}, compiled.entities
+
+    # Create every object and NPC in the level, given the column, row and legend entry of each one
+    def populate(self, entities):
+        for column, row, entry in entities:
+            for entity in self.create(column, row, entry):
+                if isinstance(entity, NPC):
+                    self.level_npc.append(entity)
+                else:
+                    self.level_objects.append(entity)
+
+    # Returns the new objects and NPCs for a cell, without adding them to the level
+    @staticmethod
+    def create(column, row, entry):
+        created = []
+        if entry.object_type is not None:
+            created.append(entry.create_object(column, row))
+        if entry.npc_type is not None:
+            created.append(entry.create_npc(column, row))
+        return created
+
+    # Returns a level built from a level file, which is compiled if it ends with the compiled level extension
+    @classmethod
+    def from_file(cls, title, path, **kwargs):
+        return cls(title, level_file.read(path), **kwargs)
+
+    # Record the state of every object and NPC in the level, as well as the items they hold
+    def snapshot(self):
+        self.pristine_objects = list(self.level_objects)
+        self.pristine_npc = list(self.level_npc)
+        entities = self.level_objects + self.level_npc
+        entities += [obj.INV_OBJECT for obj in self.level_objects if isinstance(obj, DroppedItem)]
+        entities += [item for npc in self.level_npc for item in npc.inventory if item is not None]
+        self.snapshots = [Snapshot(entity) for entity in entities]
+
+    # Put the level back in the state it was built in, without parsing the layout or baking the tiles again
+    def reset(self):
+        self.level_objects = list(self.pristine_objects)
+        self.level_npc = list(self.pristine_npc)
+        self.level_bullets.clear()
+        for snapshot in self.snapshots:
+            snapshot.restore()
+        self.index_collisions()
+        self.camera = Camera()
+
+    # Index every CollideType object, every object and every NPC in the level
+    def index_collisions(self):
+        self.collision_index = SpatialHash()
+        self.object_index = SpatialHash(self.OBJECT_CELL_SIZE)
         for obj in self.level_objects:
-            if 0 - obj.OBJECT_WIDTH < obj.rect.x < surface.get_width() and 0 - obj.OBJECT_HEIGHT < obj.rect.y < surface.get_height():
-                obj.draw(surface)
+            if isinstance(obj, CollideType):
+                self.collision_index.insert(obj)
+            self.object_index.insert(obj)
+        self.npc_index = SpatialHash(self.NPC_CELL_SIZE)
         for npc in self.level_npc:
-            if 0 - npc.NPC_WIDTH < npc.rect.x < surface.get_width() and 0 - npc.NPC_HEIGHT < npc.rect.y < surface.get_height():
-                npc.draw(surface)
+            self.npc_index.insert(npc)
+        self.resting = SpatialHash()
+        self.scheduler.reset()
+
+    # List every oversized tile in the grid under the chunks it overlaps
+    # The grid is translated into a flag for each cell, so only the cells with oversized tiles are visited
+    def index_overlaps(self):
+        self.overlaps = {}
+        flags = bytes(self.tiles).translate(tiles.OVERSIZED_TILES)
+        index = flags.find(1)
+        while index != -1:
+            self.add_overlap(index)
+            index = flags.find(1, index + 1)
+
+    # Returns the keys of every chunk overlapped by the image of the tile in a cell of the grid
+    def overlapped_chunks(self, index):
+        size = self.CHUNK_SIZE
+        tile = TILE_TYPES[self.tiles[index]]
+        x, y = index % self.columns * TILE_SIZE, index // self.columns * TILE_SIZE
+        return [(chunk_x, chunk_y) for chunk_x in range(x // size, (x + tile.width - 1) // size + 1)
+                for chunk_y in range(y // size, (y + tile.height - 1) // size + 1)]
+
+    def add_overlap(self, index):
+        for key in self.overlapped_chunks(index):
+            self.overlaps.setdefault(key, []).append(index)
+
+    # Draw every tile onto the chunks it overlaps, in the same order they would be drawn each frame
+    # Tiles larger than a cell, like trees and buildings, are drawn onto every chunk they reach into
+    # Only the columns of chunks from first_chunk to last_chunk are baked, which is every chunk by default
+    def bake(self, first_chunk=0, last_chunk=None):
+        size = self.CHUNK_SIZE
+        first_column = max((first_chunk * size - tiles.OVERHANG_X) // TILE_SIZE, 0)
+        last_column = self.columns - 1
+        if last_chunk is not None:
+            last_column = min(((last_chunk + 1) * size - 1) // TILE_SIZE, last_column)
+        baked = []
+        for row in range(self.rows):
+            start = row * self.columns
+            for column, tile_id in enumerate(self.tiles[start + first_column:start + last_column + 1], first_column):
+                if not tile_id:
+                    continue
+                tile = TILE_TYPES[tile_id]
+                x, y = column * TILE_SIZE, row * TILE_SIZE
+                last_x = (x + tile.width - 1) // size
+                if last_chunk is not None:
+                    last_x = min(last_x, last_chunk)
+                for chunk_x in range(max(x // size, first_chunk), last_x + 1):
+                    for chunk_y in range(y // size, (y + tile.height - 1) // size + 1):
+                        chunk = self.chunks.get((chunk_x, chunk_y))
+                        if chunk is None:
+                            chunk = pygame.Surface((size, size), pygame.SRCALPHA)
+                            self.chunks[(chunk_x, chunk_y)] = chunk
+                            baked.append((chunk_x, chunk_y))
+                        tile.draw(chunk, (x - chunk_x * size, y - chunk_y * size))
+        for position in baked:
+            self.chunks[position] = self.chunks[position].convert_alpha()
+
+    # Draw the baked chunks which overlap the game's viewport
+    def draw_chunks(self, surface):
+        size = self.CHUNK_SIZE
+        left, top = self.camera.offset()
+        for chunk_x in range(left // size, (left + surface.get_width() - 1) // size + 1):
+            for chunk_y in range(top // size, (top + surface.get_height() - 1) // size + 1):
+                chunk = self.chunks.get((chunk_x, chunk_y))
+                if chunk is not None:
+                    surface.blit(chunk, (chunk_x * size - left, chunk_y * size - top))
+
+    # Draw each tile in the game's viewport, including tiles in cells outside of it which are large enough to reach in
+    # Tiles are drawn row by row, and oversized tiles from cells above or to the left of the viewport are found
+    # in the overlap lists of the chunks in view, then drawn in the same order as if every cell had been looked at
+    def draw_tiles(self, surface):
+        left, top = self.camera.offset()
+        right, bottom = left + surface.get_width(), top + surface.get_height()
+        first_column = max(left // TILE_SIZE, 0)
+        last_column = min((right - 1) // TILE_SIZE, self.columns - 1)
+        first_row = max(top // TILE_SIZE, 0)
+        last_row = min((bottom - 1) // TILE_SIZE, self.rows - 1)
 
-    # Alter the position of objects, NPCs and bullets in the map to
-    # create the effect that the player is moving across the map
+        size = self.CHUNK_SIZE
+        reaching = set()
+        for chunk_x in range(left // size, (right - 1) // size + 1):
+            for chunk_y in range(top // size, (bottom - 1) // size + 1):
+                for index in self.overlaps.get((chunk_x, chunk_y), ()):
+                    column, row = index % self.columns, index // self.columns
+                    if column >= first_column and row >= first_row:
+                        continue
+                    tile = TILE_TYPES[self.tiles[index]]
+                    if column * TILE_SIZE + tile.width > left and row * TILE_SIZE + tile.height > top:
+                        reaching.add(index)
+        reaching = sorted(reaching)
+
+        # The grid is in row order, so sorting the cells puts the rows above the viewport first
+        # and the cells to the left of each row before the cells in it
+        position = 0
+        for row in range(first_row, last_row + 1):
+            while position < len(reaching) and reaching[position] < row * self.columns + first_column:
+                index = reaching[position]
+                TILE_TYPES[self.tiles[index]].draw(surface, (index % self.columns * TILE_SIZE - left,
+                                                             index // self.columns * TILE_SIZE - top))
+                position += 1
+            start = row * self.columns
+            for column, tile_id in enumerate(self.tiles[start + first_column:start + last_column + 1], first_column):
+                if tile_id:
+                    TILE_TYPES[tile_id].draw(surface, (column * TILE_SIZE - left, row * TILE_SIZE - top))
+
+    # Advance the level by one step of the game, dt seconds long
+    # Objects are only updated while they are visible in the game's viewport, NPCs are updated depending on how far
+    # they are from the player, and bullets are updated wherever they are
+    def update(self, dt):
+        for obj in self.object_index.query(self.camera.view(), ordered=True):
+            moving = isinstance(obj, Body) and not obj.resting
+            obj.update(dt)
+            if moving:
+                self.object_index.move(obj)
+        self.scheduler.update(dt, pygame.player)
+        self.update_bullets()
+
+    # Resolve every bullet in one pass: a bullet is removed once it hits an NPC, the player or a solid tile,
+    # or leaves the screen, and otherwise moves along by its speed
+    # Only the NPCs near each bullet are tested, and NPCs that run out of health are removed afterwards,
+    # once per step, dropping everything in their inventory
+    def update_bullets(self):
+        bullets = self.level_bullets
+        if not bullets:
+            return
+        player = pygame.player
+        x, facing, origins = bullets.x, bullets.facing, bullets.origins
+        steps = (Bullet.SPEED, -Bullet.SPEED)
+        left, right = self.camera.x, self.camera.x + self.camera.width
+        dead = {}
+        for slot in bullets.slots():
+            rect = bullets.rect(slot)
+            if isinstance(origins[slot], Player):
+                hits = self.npc_index.query(rect)
+                for npc in hits:
+                    npc.change_health(-1)
+                    if npc.HEALTH <= 0:
+                        dead[npc] = True
+                if hits:
+                    bullets.kill(slot)
+                    continue
+            x[slot] += steps[facing[slot]]
+            rect.x = x[slot]
+            if x[slot] < left or x[slot] > right:
+                bullets.kill(slot)
+            elif isinstance(origins[slot], NPC) and rect.colliderect(player.rect):
+                player.change_hp(-1)
+                bullets.kill(slot)
+            elif self.collides(rect):
+                bullets.kill(slot)
+
+        for npc in dead:
+            player.add_score(10)
+            for i, item in enumerate(npc.inventory):
+                self.add_object(DroppedItem((npc.rect.x + 32*i)/32, npc.rect.y/32, item))
+            self.remove_npc(npc)
+
+    # Save where the player and every body near the viewport which can move is before a step of the game,
+    # so frames can be drawn between steps
+    # Resting bodies and everything else in the level stay where they are, so they are drawn without being saved
+    def save_positions(self):
+        view = self.camera.view().inflate(self.SAVE_MARGIN * 2, self.SAVE_MARGIN * 2)
+        rects = [pygame.player.rect]
+        rects += [obj.rect for obj in self.object_index.query(view) if isinstance(obj, Body) and not obj.resting]
+        rects += [npc.rect for npc in self.npc_index.query(view) if not npc.resting]
+        self.camera.save(rects)
+        self.level_bullets.save()
+
+    # Draw the static tiles, then call the draw function of every object, NPC and bullet within the map,
+    # given it is currently visible in the game's viewport
+    def draw(self, surface):
+        camera = self.camera
+        if self.bake_static:
+            self.draw_chunks(surface)
+        else:
+            self.draw_tiles(surface)
+        left, top = camera.offset()
+        view = pygame.Rect(left, top, surface.get_width(), surface.get_height())
+        visible = self.object_index.query(view, ordered=True)
+        for obj in visible:
+            obj.draw(surface, camera)
+        self.visible = len(visible)
+        for npc in self.npc_index.query(view, ordered=True):
+            npc.draw(surface, camera)
+        self.level_bullets.draw(surface, camera)
+
+    # Move the camera across the map to create the effect that the player is moving across the map
+    # The level moves by (vel_x, vel_y) on the screen, so the camera moves the opposite way
     def scroll(self, vel_x, vel_y):
-        for obj in self.level_objects:
-            obj.rect.x += vel_x
-            obj.rect.y += vel_y
-        for npc in self.level_npc:
-            npc.rect.x += vel_x
-            npc.rect.y += vel_y
-        for bullet in self.level_bullets:
-            bullet.rect.x += vel_x
-            bullet.rect.y += vel_y
+        self.camera.move(-vel_x, -vel_y)
+
+    # Add an object to the level after it has been built, such as an item dropped by the player or an NPC
+    def add_object(self, obj):
+        self.level_objects.append(obj)
+        self.object_index.insert(obj)
+        if isinstance(obj, CollideType):
+            self.collision_index.insert(obj)
+
+    def remove_object(self, obj):
+        self.level_objects.remove(obj)
+        self.object_index.remove(obj)
+        if obj in self.collision_index:
+            self.collision_index.remove(obj)
+            self.wake(obj.rect)
+        if obj in self.resting:
+            self.resting.remove(obj)
+
+    def remove_npc(self, npc):
+        self.level_npc.remove(npc)
+        self.npc_index.remove(npc)
+        self.scheduler.remove(npc)
+        if npc in self.resting:
+            self.resting.remove(npc)
+
+    # Keep track of a body which has landed, so it can be woken if what it rests on is removed
+    def sleep(self, body):
+        if body not in self.resting:
+            self.resting.insert(body)
+
+    # Wake every body resting on top of an area which had something solid removed from it
+    def wake(self, area):
+        above = pygame.Rect(area.x, area.y - 1, area.width, area.height + 1)
+        for body in self.resting.query(above):
+            self.resting.remove(body)
+            body.wake()
+
+    # Returns if a rectangle collides with a solid tile or any CollideType object in the level
+    # Only the cells of the tile grid the rectangle overlaps are checked
+    def collides(self, rect):
+        first_column = max(rect.x // TILE_SIZE, 0)
+        last_column = min((rect.x + rect.width - 1) // TILE_SIZE, self.columns - 1)
+        first_row = max(rect.y // TILE_SIZE, 0)
+        last_row = min((rect.y + rect.height - 1) // TILE_SIZE, self.rows - 1)
+        for row in range(first_row, last_row + 1):
+            start = row * self.columns
+            for column in range(first_column, last_column + 1):
+                if SOLID_TILES[self.tiles[start + column]]:
+                    return True
+        return self.collision_index.any(rect)
 
     def get_spawn_point(self):
         return self.spawn_point
 
+    # Returns roughly how many bytes the tile grid and baked chunks of the level take up
+    def memory_usage(self):
+        return len(self.tiles) + sum(chunk.get_width() * chunk.get_height() * chunk.get_bytesize()
+                                     for chunk in self.chunks.values())
+
+    # Release every object in the level, then evict any textures which are no longer used by another level
+    def unload(self):
+        self.tiles = bytes()
+        if isinstance(self.layout, CompiledLevel):
+            self.layout.close()
+        self.layout = None
+        self.columns, self.rows = 0, 0
+        self.level_objects = []
+        self.collision_index = SpatialHash()
+        self.object_index = SpatialHash(self.OBJECT_CELL_SIZE)
+        self.npc_index = SpatialHash(self.NPC_CELL_SIZE)
+        self.resting = SpatialHash()
+        self.scheduler.reset()
+        self.overlaps = {}
+        self.level_npc = []
+        self.level_bullets = BulletPool()
+        self.pristine_objects, self.pristine_npc, self.snapshots = [], [], []
+        self.chunks = {}
+        TEXTURES.evict(unused=True)
+
     def align(self, x, y):
-        for obj in self.level_objects:
-            obj.rect.x += x
-            obj.rect.y += y
-        for npc in self.level_npc:
-            npc.rect.x += x
-            npc.rect.y += y
+        self.scroll(x, y)
+
+    # Move the camera so that the spawn point is on the screen, if it is past the bottom or right of the first screen
+    def align_spawn(self):
+        width, height = self.camera.width, self.camera.height
+        spawn_point = self.get_spawn_point()
+        if width - spawn_point.rect.x < 0:
+            self.align(width - spawn_point.rect.x - width//5, 0)
+        if height - spawn_point.rect.y < 0:
+            self.align(0, height - spawn_point.rect.y - width//5)
+
+
+# A level which only keeps the objects, NPCs and baked chunks near the camera, for levels far wider than the screen
+# The level is split into strips of columns, which are loaded as the camera comes near them and evicted once it is
+# far away, and the tile grid is kept whole, since it only takes a byte per cell
+# Objects and NPCs in an evicted strip which changed are kept whole, along with the items they hold, and anything
+# which was removed from the level stays removed, so a strip is the same as it was left when it is loaded again
+class StreamingLevel(Level):
+
+    # Number of columns in each strip, which is a whole number of chunks wide
+    STRIP_COLUMNS = 64
+
+    # How far, in pixels, past the edges of the viewport strips are loaded, and how far they have to be to be evicted
+    LOAD_MARGIN = 1024
+    EVICT_MARGIN = 3072
+
+    # The id, column, row and legend entry of every object and NPC in each strip, and the entities in each loaded strip
+    strips: list
+    loaded: dict
+
+    # The id and strip of every entity which is loaded, and its state when it was created from the layout,
+    # where entities added while playing have no id
+    homes: dict
+
+    # Entities in evicted strips which changed, keyed by their id, the ids of entities which were removed,
+    # and entities added while playing which were in a strip when it was evicted
+    saved: dict
+    removed: set
+    added: dict
+
+    # The first and last strip which were near the camera the last time strips were loaded
+    window: tuple | None
+
+    def __init__(self, title, layout, bake_static=True, legend=None):
+        super().__init__(title, layout, bake_static=False, legend=legend)
+        self.bake_static = bake_static
+        self.stream()
+
+    # Sort the entities into strips, rather than creating them
+    def populate(self, entities):
+        self.strips = [[] for _ in range(self.columns // self.STRIP_COLUMNS + 1)]
+        for entity_id, (column, row, entry) in enumerate(entities):
+            self.strips[column // self.STRIP_COLUMNS].append((entity_id, column, row, entry))
+        self.loaded, self.homes = {}, {}
+        self.saved, self.removed, self.added = {}, set(), {}
+        self.window = None
+
+    # Load the strips near the camera, and evict the strips which are far from it
+    def stream(self):
+        width = self.STRIP_COLUMNS * TILE_SIZE
+        camera = self.camera
+        first = max((camera.x - self.LOAD_MARGIN) // width, 0)
+        last = min((camera.x + camera.width + self.LOAD_MARGIN) // width, len(self.strips) - 1)
+        if self.window == (first, last):
+            return
+        self.window = first, last
+        for strip in range(first, last + 1):
+            if strip not in self.loaded:
+                self.load_strip(strip)
+        for strip in list(self.loaded):
+            if (strip + 1) * width < camera.x - self.EVICT_MARGIN or strip * width > camera.x + camera.width + self.EVICT_MARGIN:
+                self.evict_strip(strip)
+
+    # Create the entities in a strip, or bring back the ones which changed before it was evicted, and bake its chunks
+    # Kept bodies are woken, since they are no longer in the index of resting bodies which would wake them
+    def load_strip(self, strip):
+        self.loaded[strip] = []
+        for entity_id, column, row, entry in self.strips[strip]:
+            for part, entity in enumerate(self.create(column, row, entry)):
+                key = (entity_id, part)
+                if key in self.removed:
+                    continue
+                pristine = self.state(entity)
+                kept = self.saved.pop(key, None)
+                if kept is not None:
+                    entity = kept
+                    if isinstance(entity, Body):
+                        entity.wake()
+                self.place(entity, (key, strip, pristine))
+        for entity in self.added.pop(strip, ()):
+            self.place(entity, (None, strip, None))
+        if self.bake_static:
+            chunks = self.STRIP_COLUMNS * TILE_SIZE // self.CHUNK_SIZE
+            self.bake(strip * chunks, (strip + 1) * chunks - 1)
+
+    # Add a loaded entity to the level and its strip
+    def place(self, entity, home):
+        if isinstance(entity, NPC):
+            self.level_npc.append(entity)
+            self.npc_index.insert(entity)
+        else:
+            super().add_object(entity)
+        self.loaded[home[1]].append(entity)
+        self.homes[entity] = home
 
+    # Returns the attributes of an entity and of the items it holds, which are compared to tell if it changed
+    # Whether a body is resting isn't compared, as it only says whether the body has landed yet
+    @staticmethod
+    def state(entity):
+        parts = [entity]
+        if isinstance(entity, DroppedItem):
+            parts.append(entity.INV_OBJECT)
+        if isinstance(entity, NPC):
+            parts += [item for item in entity.inventory if item is not None]
+        return [Snapshot(part, exclude=('resting',)).state for part in parts]
 
-# A structure containing a list of levels, the current level and methods to get the next level in line
+    # Keep the entities in a strip which changed and remove them from the level, then drop its chunks
+    def evict_strip(self, strip):
+        entities = self.loaded.pop(strip)
+        for entity in entities:
+            key, _, pristine = self.homes.pop(entity)
+            if key is None:
+                self.added.setdefault(strip, []).append(entity)
+            elif self.state(entity) != pristine:
+                self.saved[key] = entity
+            if entity in self.collision_index:
+                self.collision_index.remove(entity)
+            if entity in self.object_index:
+                self.object_index.remove(entity)
+            if entity in self.npc_index:
+                self.npc_index.remove(entity)
+                self.scheduler.remove(entity)
+            if entity in self.resting:
+                self.resting.remove(entity)
+        evicted = set(entities)
+        self.level_objects = [obj for obj in self.level_objects if obj not in evicted]
+        self.level_npc = [npc for npc in self.level_npc if npc not in evicted]
+        chunks = self.STRIP_COLUMNS * TILE_SIZE // self.CHUNK_SIZE
+        for position in [position for position in self.chunks if strip * chunks <= position[0] < (strip + 1) * chunks]:
+            del self.chunks[position]
+
+    # Remember that an entity was removed, so it isn't created again when its strip is loaded
+    def forget(self, entity):
+        home = self.homes.pop(entity, None)
+        if home is None:
+            return
+        key, strip, _ = home
+        self.loaded[strip].remove(entity)
+        if key is not None:
+            self.removed.add(key)
+
+    # Objects added while playing, like dropped items, belong to the strip they are in
+    # An object added to a strip which isn't loaded waits with the strip's other entities until it is
+    def add_object(self, obj):
+        strip = min(max(obj.rect.x // (self.STRIP_COLUMNS * TILE_SIZE), 0), len(self.strips) - 1)
+        if strip not in self.loaded:
+            self.added.setdefault(strip, []).append(obj)
+            return
+        super().add_object(obj)
+        self.loaded[strip].append(obj)
+        self.homes[obj] = (None, strip, None)
+
+    def remove_object(self, obj):
+        super().remove_object(obj)
+        self.forget(obj)
+
+    def remove_npc(self, npc):
+        super().remove_npc(npc)
+        self.forget(npc)
+
+    def update(self, dt):
+        self.stream()
+        super().update(dt)
+
+    def draw(self, surface):
+        self.stream()
+        super().draw(surface)
+
+    # Put the level back in the state it was built in, by evicting every strip without saving anything
+    def reset(self):
+        self.level_objects, self.level_npc = [], []
+        self.level_bullets.clear()
+        self.populate([(column, row, entry) for strip in self.strips for _, column, row, entry in strip])
+        self.chunks = {}
+        self.index_collisions()
+        self.camera = Camera()
+        self.stream()
+
+    def unload(self):
+        super().unload()
+        self.strips = []
+        self.loaded, self.homes = {}, {}
+        self.saved, self.removed, self.added = {}, set(), {}
+
+
+# Returns a level built from a level file, which is streamed if it is more than STREAM_COLUMNS wide
+# Compiled levels know how wide they are from their header, and text levels are only read once either way
+def open_level(title, path, **kwargs):
+    layout = level_file.read(path)
+    if isinstance(layout, CompiledLevel):
+        columns = layout.columns
+    else:
+        columns = max(len(line) for line in layout.split('\n'))
+    if columns > STREAM_COLUMNS:
+        return StreamingLevel(title, layout, **kwargs)
+    return Level(title, layout, **kwargs)
+
+
+# A structure containing the levels in the game, the current level and methods to get the next level in line
+# Only the current level is built up front, and the next level is built on a worker thread while the current one is played
 class Levels:
 
-    levels: list = []
+    # The title and file of every level, in order
+    sources: list
     current: Level
     player: Player
 
-    def __init__(self, levels, player):
-        self.levels = levels
-        self.current = self.levels[0]
+    # Levels that have been built keyed by their index, and the threads building them
+    loaded: dict
+    loading: dict
+    index: int
+
+    # The most memory, in bytes, that levels which have been finished can take up before they are released
+    MEMORY_BUDGET = 64 * 1024 * 1024
+
+    def __init__(self, sources, player, memory_budget=MEMORY_BUDGET):
+        self.sources = sources
         self.player = player
+        self.memory_budget = memory_budget
+        self.loaded = {}
+        self.loading = {}
+        self.lock = threading.Lock()
+        self.index = 0
+        self.current = self.load(0)
         self.spawn_player()
+        self.prefetch(1)
+
+    # Build the level at an index on a worker thread, unless it has been built or is being built already
+    def prefetch(self, index):
+        with self.lock:
+            if not 0 <= index < len(self.sources) or index in self.loaded or index in self.loading:
+                return
+            thread = threading.Thread(target=self.build, args=(index,), daemon=True)
+            self.loading[index] = thread
+        thread.start()
+
+    def build(self, index):
+        try:
+            level = open_level(*self.sources[index])
+        except Exception:
+            # Leave the level unbuilt, so that load builds it again on the main thread and raises the error there
+            level = None
+        with self.lock:
+            if level is not None:
+                self.loaded[index] = level
+            self.loading.pop(index, None)
+
+    # Returns the level at an index, waiting for it if it is being prefetched, or building it if it is not
+    # The lock is only held while the dictionaries are used, never while a level is built or waited for
+    def load(self, index):
+        with self.lock:
+            thread = self.loading.get(index)
+        if thread is not None:
+            thread.join()
+        with self.lock:
+            level = self.loaded.get(index)
+        if level is None:
+            level = open_level(*self.sources[index])
+            with self.lock:
+                level = self.loaded.setdefault(index, level)
+        return level
+
+    # Release finished levels, oldest first, until the levels which are loaded fit in the memory budget
+    # Levels being prefetched can be added while this runs, so it works from a copy of the levels loaded so far
+    def release(self):
+        with self.lock:
+            loaded = dict(self.loaded)
+        finished = sorted(index for index in loaded if index < self.index)
+        total = sum(level.memory_usage() for level in loaded.values())
+        for index in finished:
+            if total <= self.memory_budget:
+                break
+            with self.lock:
+                level = self.loaded.pop(index)
+            total -= level.memory_usage()
+            level.unload()
 
     def __add__(self, other):
         if isinstance(other, int):
-            if self.levels[self.levels.index(self.current) + other] is not None:
-                self.current = self.levels[self.levels.index(self.current) + other]
-                spawn_point = self.current.get_spawn_point()
-                if 832 - spawn_point.rect.x < 0:
-                    self.current.align(832 - spawn_point.rect.x - 832//5, 0)
-                if 640 - spawn_point.rect.y < 0:
-                    self.current.align(0, 640 - spawn_point.rect.y - 832//5)
+            if 0 <= self.index + other < len(self.sources):
+                self.index += other
+                self.current = self.load(self.index)
+                self.release()
+                self.current.align_spawn()
                 self.spawn_player()
+                self.prefetch(self.index + 1)
+
+    # Go back to the first level, putting every level which is still loaded back in the state it was built in
+    def reset(self):
+        with self.lock:
+            built = list(self.loaded.values())
+        for level in built:
+            level.reset()
+        self.index = 0
+        self.current = self.load(0)
+        self.spawn_player()
+        self.prefetch(1)
 
     def spawn_player(self):
         self.player.rect.x = self.current.spawn_point.rect.x
         self.player.rect.y = self.current.spawn_point.rect.y - self.player.PLAYER_WIDTH / 2
 
+    # Returns if there is a level after the current one
+    def has_next(self):
+        return self.index + 1 < len(self.sources)
+
+    # Returns the title of the next level, without waiting for it to be built
+    def next_title(self):
+        return self.sources[self.index + 1][0] if self.has_next() else None
+
+    # Returns the next level, waiting for it to be built if necessary
     def next(self):
-        if 0 < self.levels.index(self.current) + 1 < len(self.levels):
-            return self.levels[self.levels.index(self.current) + 1]
+        if self.has_next():
+            return self.load(self.index + 1)
         return None
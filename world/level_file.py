@@ -0,0 +1,211 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os.path
+import struct
+import sys
+
+from world.legend import Legend, LegendEntry, TILES
+
+# Compiles text levels into a binary format which can be loaded without parsing the layout
+#
+#   python -m world.level_file assets/levels/*.txt
+#   python -m world.level_file assets/levels/2.txt --out /tmp/2.lvl
+#
+# A compiled level is a header, followed by the tile grid, the entity table and the spec table:
+#   header     magic, format version, bytes per tile id, digest of the legend and tile table, columns, rows,
+#              number of cells with a tile, spawn column and row, number of entities and length of the spec table
+#   tiles      the id of the tile in every cell, row by row, one byte per tile id
+#   entities   the column, row and spec of every object and NPC, in the order they appear in the layout
+#   specs      a JSON list of the legend character and entry of every spec, which says the type of each
+#              entity, what it holds and the text of signs
+
+MAGIC = b'ATLV'
+VERSION = 2
+EXTENSION = '.lvl'
+SOURCE_EXTENSION = '.txt'
+
+# The magic and version come first in every version of the format, so they can be checked before the rest is read
+PREFIX = struct.Struct('<4sH')
+HEADER = struct.Struct('<4sHH8sIIIIIII')
+ENTITY = struct.Struct('<IIH')
+
+# The game keeps tile ids in a byte each, so a grid is only compiled if every id fits in one
+TILE_BYTES = 1
+
+
+# Returns a digest of the legend and the ids of every tile it can use
+# Compiled levels hold tile ids and legend entries, so they are out of date if either of these change
+def digest(legend=None):
+    legend = Legend.get_default() if legend is None else legend
+    specs = {char: entry.spec for char, entry in legend.entries.items()}
+    tiles = sorted((name, tile.id) for name, tile in TILES.items())
+    return hashlib.sha1(json.dumps([specs, tiles], sort_keys=True).encode('utf-8')).digest()[:8]
+
+
+# An error in a level layout which stops it from being compiled, with where it happened if it is about a cell
+class LevelError(ValueError):
+    pass
+
+
+# Returns the bytes of a compiled level, built from a text layout with a legend
+# Raises LevelError if a character isn't in the legend, or the layout doesn't have exactly one spawn point
+def compile_layout(layout, legend=None, path='<layout>'):
+    legend = Legend.get_default() if legend is None else legend
+    lines = layout.split('\n')
+    rows = len(lines)
+    columns = max(len(line) for line in lines)
+    tiles = bytearray(columns * rows)
+    entities = []
+    specs = {}
+    spawns = []
+    for row, line in enumerate(lines):
+        for column, char in enumerate(line):
+            if char.isspace():
+                continue
+            entry = legend.get(char)
+            if entry is None:
+                raise LevelError(f"{path}:{row + 1}:{column + 1}: unknown character '{char}'")
+            if entry.tile_id >= 256 ** TILE_BYTES:
+                raise LevelError(f"{path}:{row + 1}:{column + 1}: tile id {entry.tile_id} doesn't fit in {TILE_BYTES} byte")
+            tiles[row * columns + column] = entry.tile_id
+            if entry.spawn:
+                spawns.append((column, row))
+            if entry.object_type is not None or entry.npc_type is not None:
+                spec = specs.setdefault(char, len(specs))
+                entities.append(ENTITY.pack(column, row, spec))
+    if not spawns:
+        raise LevelError(f'{path}: no spawn point')
+    if len(spawns) > 1:
+        raise LevelError(f'{path}: {len(spawns)} spawn points, at ' + ', '.join(f'{row + 1}:{column + 1}' for column, row in spawns))
+
+    table = json.dumps([[char, legend.get(char).spec] for char in specs]).encode('utf-8')
+    header = HEADER.pack(MAGIC, VERSION, TILE_BYTES, digest(legend), columns, rows, len(tiles) - tiles.count(0), *spawns[0], len(entities), len(table))
+    return header + bytes(tiles) + b''.join(entities) + table
+
+
+# A compiled level file, mapped into memory so the tile grid is only read from the disk as it is used
+# Raises LevelError if the file wasn't compiled by this version of the compiler with the same legend and tiles
+class CompiledLevel:
+
+    columns: int
+    rows: int
+    tile_count: int
+    spawn: tuple
+
+    # The tile grid, which is a view of the mapped file rather than a copy of it
+    tiles: memoryview
+
+    # The column, row and legend entry of every object and NPC in the level
+    entities: list
+
+    def __init__(self, path, legend=None):
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            check(self.map, path, legend)
+        except LevelError:
+            self.map.close()
+            raise
+        magic, version, tile_bytes, source, self.columns, self.rows, self.tile_count, spawn_column, spawn_row, count, \
+            table_size = HEADER.unpack_from(self.map)
+        self.spawn = spawn_column, spawn_row
+
+        start = HEADER.size
+        self.tiles = memoryview(self.map)[start:start + self.columns * self.rows]
+        start += self.columns * self.rows
+        table = json.loads(self.map[start + count * ENTITY.size:start + count * ENTITY.size + table_size])
+        entries = [LegendEntry(char, spec) for char, spec in table]
+        self.entities = [(column, row, entries[spec]) for column, row, spec in ENTITY.iter_unpack(
+            self.map[start:start + count * ENTITY.size])]
+
+    # Unmap the file, once nothing uses the tile grid any more
+    # The view of the tile grid has to be released first, as a file can't be unmapped while it is still being viewed
+    def close(self):
+        self.tiles.release()
+        self.map.close()
+
+
+# Raise LevelError if the start of a file isn't the header of a level compiled by this version of the compiler,
+# with the same legend and tile table as the game has now
+def check(data, path, legend=None):
+    if len(data) < HEADER.size or data[:len(MAGIC)] != MAGIC:
+        raise LevelError(f'{path}: not a compiled level')
+    magic, version = PREFIX.unpack_from(data)
+    if version != VERSION:
+        raise LevelError(f'{path}: compiled by an incompatible version of the level compiler')
+    magic, version, tile_bytes, source = HEADER.unpack_from(data)[:4]
+    if tile_bytes != TILE_BYTES:
+        raise LevelError(f'{path}: compiled by an incompatible version of the level compiler')
+    if source != digest(legend):
+        raise LevelError(f'{path}: compiled with a different legend or tile table')
+
+
+# Returns where the compiled copy of a text level goes, next to it with a different extension
+def compiled_path(path):
+    return os.path.splitext(path)[0] + EXTENSION
+
+
+# Returns where the text level a compiled level was compiled from is
+def source_path(path):
+    return os.path.splitext(path)[0] + SOURCE_EXTENSION
+
+
+# Returns the compiled copy of a text level if there is one which is at least as new as the text, and was compiled
+# with the legend and tiles the game has now, otherwise the text
+def newest(path):
+    compiled = compiled_path(path)
+    if not os.path.isfile(compiled) or os.path.getmtime(compiled) < os.path.getmtime(path):
+        return path
+    try:
+        with open(compiled, 'rb') as file:
+            check(file.read(HEADER.size), compiled)
+    except (OSError, LevelError):
+        return path
+    return compiled
+
+
+# Returns the layout of a level file, which is a CompiledLevel for compiled levels and the text for text levels
+# A compiled level which is out of date is skipped for the text level it was compiled from, if there is one
+def read(path):
+    if path.endswith(EXTENSION):
+        try:
+            return CompiledLevel(path)
+        except LevelError:
+            if not os.path.isfile(source_path(path)):
+                raise
+            path = source_path(path)
+    with open(path, 'r') as file:
+        return file.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile text levels into binary level files.')
+    parser.add_argument('levels', nargs='+', help='text level files to compile')
+    parser.add_argument('--out', help='file to write the compiled level to, when compiling a single level')
+    parser.add_argument('--legend', default=Legend.PATH)
+    args = parser.parse_args()
+    if args.out and len(args.levels) > 1:
+        parser.error('--out can only be used with a single level')
+
+    legend = Legend.load(args.legend)
+    failed = False
+    for path in args.levels:
+        with open(path, 'r') as file:
+            layout = file.read()
+        try:
+            compiled = compile_layout(layout, legend, path)
+        except LevelError as error:
+            print(error, file=sys.stderr)
+            failed = True
+            continue
+        out = args.out or compiled_path(path)
+        with open(out, 'wb') as file:
+            file.write(compiled)
+        print(f'{path} -> {out} ({len(compiled)} bytes)')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,12 +2,17 @@ import os.path
 
 import pygame
 
+from engine.assets import Asset, Sound
+from engine.textures import TEXTURES
+from world.physics import Body
+
 
 # A structure for a 32x32 object that will appear on the level
 class ObjectType:
 
-    # Dimensions of the object
+    # Dimensions of the object, and the size its texture is drawn at if it is not 32x32
     OBJECT_WIDTH, OBJECT_HEIGHT = 32, 32
+    SIZE = OBJECT_WIDTH, OBJECT_HEIGHT
 
     # Texture to be displayed
     TEXTURE: pygame.Surface
@@ -16,18 +21,25 @@ class ObjectType:
     rect: pygame.Rect
 
     # Initialise the texture for the object and resize it
+    # Textures are shared between every object using the same file through the texture cache
     def __init__(self, pos_x, pos_y, texture, path=None):
-        self.TEXTURE_IMG = pygame.image.load(os.path.join('assets', 'textures', 'tiles', texture) if path is None else path).convert_alpha()
-        self.TEXTURE = pygame.transform.scale(self.TEXTURE_IMG, (self.OBJECT_WIDTH, self.OBJECT_HEIGHT))
+        self.TEXTURE_PATH = os.path.join('assets', 'textures', 'tiles', texture) if path is None else path
+        self.TEXTURE_IMG = TEXTURES.get(self.TEXTURE_PATH)
+        self.TEXTURE = TEXTURES.get(self.TEXTURE_PATH, (self.OBJECT_WIDTH, self.OBJECT_HEIGHT))
         self.rect = pygame.Rect(pos_x*self.OBJECT_WIDTH, pos_y*self.OBJECT_HEIGHT, self.OBJECT_WIDTH, self.OBJECT_HEIGHT)
 
-    # Draw the object at it's position in the level
-    def draw(self, surface):
-        surface.blit(self.TEXTURE, (self.rect.x, self.rect.y))
+    # Advance the object by one step of the game, dt seconds long
+    # Most objects never change, so this does nothing unless it is altered in the subclass
+    def update(self, dt):
+        pass
+
+    # Draw the object at it's position in the level, relative to the camera
+    def draw(self, surface, camera):
+        surface.blit(self.TEXTURE, camera.project(self.rect))
 
     # Function used to resize some textures if they are not 32x32
     def set_size(self, x, y):
-        self.TEXTURE = pygame.transform.scale(self.TEXTURE_IMG, (x, y))
+        self.TEXTURE = TEXTURES.get(self.TEXTURE_PATH, (x, y))
         self.rect.width = x
         self.rect.height = y
 
@@ -68,19 +80,21 @@ class Glass(ObjectType):
 class Bush(ObjectType):
 
     texture = "bush.png"
+    SIZE = 64, 32
 
     def __init__(self, pos_x, pos_y):
         super().__init__(pos_x, pos_y, self.texture)
-        self.set_size(64, 32)
+        self.set_size(*self.SIZE)
 
 
 class Tree(ObjectType):
 
     texture = "tree.png"
+    SIZE = 128, 138
 
     def __init__(self, pos_x, pos_y):
         super().__init__(pos_x, pos_y, self.texture)
-        self.set_size(128, 138)
+        self.set_size(*self.SIZE)
 
 
 class DirtBkg(ObjectType):
@@ -94,19 +108,21 @@ class DirtBkg(ObjectType):
 class BuildingBkg1(ObjectType):
 
     texture = "buildingbkg1.png"
+    SIZE = 713, 160
 
     def __init__(self, pos_x, pos_y):
         super().__init__(pos_x, pos_y, self.texture)
-        self.set_size(713, 160)
+        self.set_size(*self.SIZE)
 
 
 class BuildingBkg2(ObjectType):
 
     texture = "buildingbkg2.png"
+    SIZE = 713, 160
 
     def __init__(self, pos_x, pos_y):
         super().__init__(pos_x, pos_y, self.texture)
-        self.set_size(713, 160)
+        self.set_size(*self.SIZE)
 
 
 # An extension of the ObjectType class that the player cannot walk past
@@ -176,10 +192,11 @@ class Barrier(CollideType):
 class Board(ObjectType):
 
     texture = 'todo.png'
+    SIZE = 192, 64
 
     def __init__(self, pos_x, pos_y):
         super().__init__(pos_x, pos_y, self.texture)
-        self.set_size(192, 64)
+        self.set_size(*self.SIZE)
 
 
 # An extension of the ObjectType that, when collided with, allows for players to interact with
@@ -207,7 +224,7 @@ class Sign(InteractiveType):
     TEXTURE = 'signpost.png'
     CONTENTS: str
 
-    READ_SOUND = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'tiles', 'pop.ogg'))
+    READ_SOUND = Sound(os.path.join('assets', 'sounds', 'tiles', 'pop.ogg'))
 
     def __init__(self, pos_x, pos_y, contents, texture=TEXTURE, popup=POPUP):
         super().__init__(self.EVENT, popup, pos_x, pos_y, texture)
@@ -225,13 +242,12 @@ class ExitDoor(InteractiveType):
     EVENT = pygame.event.Event(ENTER)
     TEXTURE = 'trapdoor.png'
 
-    NO_LEVEL = Sign(0, 0, "This portal doesn't lead\nanywhere.")
-    PORTAL_SOUND: pygame.mixer.Sound
+    NO_LEVEL = Asset(lambda: Sign(0, 0, "This portal doesn't lead\nanywhere."))
+    PORTAL_SOUND = Sound(os.path.join('assets', 'sounds', 'tiles', 'portal.wav'))
 
     def __init__(self, pos_x, pos_y, texture=TEXTURE):
         super().__init__(self.EVENT, self.POPUP, pos_x, pos_y, texture)
         self.set_size(self.OBJECT_WIDTH, 64)
-        self.PORTAL_SOUND = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'tiles', 'portal.wav'))
 
     def on_interact(self):
         self.EVENT.door = self
@@ -242,12 +258,12 @@ class ExitHelicopter(ExitDoor):
 
     TEXTURE = 'helicopter.png'
 
-    NO_LEVEL = Sign(0, 0, "This helicopter doesn't lead\nanywhere.")
+    NO_LEVEL = Asset(lambda: Sign(0, 0, "This helicopter doesn't lead\nanywhere."))
+    PORTAL_SOUND = Sound(os.path.join('assets', 'sounds', 'tiles', 'helicopter.wav'))
 
     def __init__(self, pos_x, pos_y):
         super().__init__(pos_x, pos_y, texture=self.TEXTURE)
         self.set_size(300, 128)
-        self.PORTAL_SOUND = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'tiles', 'helicopter.wav'))
 
 
 class Printer(Sign):
@@ -271,17 +287,15 @@ class Lava(InteractiveType):
     def __init__(self, pos_x, pos_y):
         super().__init__(self.EVENT, self.POPUP, pos_x, pos_y, self.TEXTURE)
 
-    def draw(self, surface):
-        super().draw(surface)
+    # Burn the player while they are touching the lava
+    def update(self, dt):
         if pygame.player.rect.colliderect(self.rect):
             self.on_interact()
 
 
 # An extension of the InteractiveType which represents an item that can be picked up
 # These items are affected by gravity and 'stores' the InventoryItem equivalent within its structure
-class DroppedItem(InteractiveType):
-
-    GRAVITY = 2
+class DroppedItem(InteractiveType, Body):
 
     POPUP = "'F' to pickup "
     PICKUP = pygame.USEREVENT + 6
@@ -298,25 +312,11 @@ class DroppedItem(InteractiveType):
         self.EVENT.item = self
         super().on_interact()
 
-    def draw(self, surface):
+    def update(self, dt):
         self.handle_movement(pygame.level)
-        super().draw(surface)
-
-    def handle_movement(self, level):
-        if self.apply_gravity(level):
-            self.rect.y += self.GRAVITY
-
-    def apply_gravity(self, level):
-        if not self.check_collision(level, (self.rect.x, self.rect.y + self.GRAVITY)):
-            return True
-        return False
 
     def check_collision(self, level, change):
         potential_rect = pygame.Rect(change[0], change[1], self.OBJECT_WIDTH, self.OBJECT_HEIGHT)
-        for level_object in level.level_objects:
-            if isinstance(level_object, CollideType):
-                if level_object.rect.colliderect(potential_rect):
-                    return True
-        return False
+        return level.collides(potential_rect)
 
 
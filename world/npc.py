@@ -1,59 +1,163 @@
+import heapq
 import os
+from array import array
+from itertools import compress
 
 import pygame
 
-from world.level_objects import CollideType
+from engine.assets import Image, Sound
+from engine.textures import TEXTURES
+from world.physics import Body
 
 
 class Bullet:
 
     # Set bullet pixel dimensions and load the bullet texture
     BULLET_WIDTH, BULLET_HEIGHT = 10, 5
-    BULLET_TEXTURE = pygame.image.load(os.path.join('assets', 'textures', 'npc', 'bullet.png')).convert_alpha()
+    BULLET_TEXTURE = Image(os.path.join('assets', 'textures', 'npc', 'bullet.png'))
 
     # Enum values for bullet direction
     RIGHT, LEFT = 0, 1
 
     # Load the bullet shoot sound
-    SHOOT_SOUND = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'misc', 'shoot.wav'))
+    SHOOT_SOUND = Sound(os.path.join('assets', 'sounds', 'misc', 'shoot.wav'))
 
     # Set the bullet speed per frame
     SPEED = 4
 
-    # Initialise a variable to store the entity which shot the bullet
-    ORIGIN = None
 
-    rect: pygame.Rect
-    facing: int
-
-    def __init__(self, x, y, facing, origin):
-        self.rect = pygame.Rect(x, y, self.BULLET_WIDTH, self.BULLET_HEIGHT)
-        self.facing = facing
-        self.ORIGIN = origin
-        self.SHOOT_SOUND.play()
-
-    def draw(self, surface):
-        surface.blit(self.BULLET_TEXTURE, (self.rect.x, self.rect.y))
-
-    def origin(self):
-        return self.ORIGIN
-
-
-class NPC:
+# Every bullet in a level, stored as columns of numbers rather than an object per bullet
+# A bullet is a slot, the same index into every column, and slots are reused once their bullet is gone,
+# so firing and removing bullets doesn't allocate anything or shift the bullets after it
+class BulletPool:
+
+    # Number of slots the pool starts with, and grows by whenever every slot is in use
+    CAPACITY = 64
+
+    # Position and direction of the bullet in each slot, and where it was before the latest step of the game
+    x: array
+    y: array
+    facing: array
+    previous: array
+
+    # Whether the bullet in each slot is still flying, and the entity which shot it
+    # The number of bullets still flying is counted for each entity which shot them
+    alive: bytearray
+    origins: list
+    shots: dict
+
+    # Free slots below the highest slot used, kept as a heap so the lowest is reused first,
+    # and how many slots from the start have been used, which is all that has to be looked through
+    free: list
+    used: int
+    count: int
+
+    # Rectangle moved over each bullet in turn to test what it hits
+    hitbox: pygame.Rect
+
+    def __init__(self, capacity=CAPACITY):
+        self.x = array('i', [0]) * capacity
+        self.y = array('i', [0]) * capacity
+        self.facing = array('b', [0]) * capacity
+        self.previous = array('i', [0]) * capacity
+        self.alive = bytearray(capacity)
+        self.origins = [None] * capacity
+        self.shots = {}
+        self.free = []
+        self.used = 0
+        self.count = 0
+        self.hitbox = pygame.Rect(0, 0, Bullet.BULLET_WIDTH, Bullet.BULLET_HEIGHT)
+
+    def __len__(self):
+        return self.count
+
+    # Add a bullet in the lowest free slot, growing the pool if there isn't one, and play the shoot sound
+    def fire(self, x, y, facing, origin):
+        if self.free:
+            slot = heapq.heappop(self.free)
+        else:
+            if self.used == len(self.alive):
+                self.grow()
+            slot = self.used
+            self.used += 1
+        self.x[slot] = self.previous[slot] = int(x)
+        self.y[slot] = int(y)
+        self.facing[slot] = facing
+        self.alive[slot] = 1
+        self.origins[slot] = origin
+        self.shots[origin] = self.shots.get(origin, 0) + 1
+        self.count += 1
+        Bullet.SHOOT_SOUND.play()
+        return slot
+
+    # Double the number of slots in every column
+    def grow(self):
+        size = len(self.alive)
+        self.x.extend(array('i', [0]) * size)
+        self.y.extend(array('i', [0]) * size)
+        self.facing.extend(array('b', [0]) * size)
+        self.previous.extend(array('i', [0]) * size)
+        self.alive.extend(bytes(size))
+        self.origins.extend([None] * size)
+
+    def kill(self, slot):
+        origin = self.origins[slot]
+        self.shots[origin] -= 1
+        if not self.shots[origin]:
+            del self.shots[origin]
+        self.alive[slot] = 0
+        self.origins[slot] = None
+        self.count -= 1
+        heapq.heappush(self.free, slot)
+
+    def clear(self):
+        self.alive[:] = bytes(len(self.alive))
+        self.origins = [None] * len(self.alive)
+        self.shots = {}
+        self.free = []
+        self.used = 0
+        self.count = 0
+
+    # Returns the slots of every bullet still flying, as a list so bullets can be killed while looping over them
+    def slots(self):
+        return list(compress(range(self.used), self.alive))
+
+    # Returns how many bullets shot by an entity are still flying
+    def owned(self, origin):
+        return self.shots.get(origin, 0)
+
+    # Returns a rectangle covering the bullet in a slot
+    # The same rectangle is moved for every bullet, so it must be used before asking for another
+    def rect(self, slot):
+        self.hitbox.x, self.hitbox.y = self.x[slot], self.y[slot]
+        return self.hitbox
+
+    # Remember where every bullet is before a step of the game, so frames can be drawn between steps
+    def save(self):
+        self.previous[:] = self.x
+
+    # Draw every bullet part way between where it was before the latest step and where it is now
+    def draw(self, surface, camera):
+        left, top = camera.offset()
+        alpha, texture = camera.alpha, Bullet.BULLET_TEXTURE
+        x, y, previous = self.x, self.y, self.previous
+        surface.blits([(texture, (round(previous[slot] + (x[slot] - previous[slot]) * alpha - left), y[slot] - top))
+                       for slot in self.slots()], doreturn=False)
+
+
+class NPC(Body):
 
     # Set variables to store the health of the NPC
     HEALTH: int
     MAX_HEALTH: int
 
     # Load the images to be used for the health bar
-    HEALTH_BAR = pygame.image.load(os.path.join('assets', 'textures', 'npc', 'health_bkg.png')).convert_alpha()
+    HEALTH_BAR = Image(os.path.join('assets', 'textures', 'npc', 'health_bkg.png'))
     HEALTH_OVERLAY = 34
 
     DEATH = pygame.USEREVENT + 3
     DEATH_EVENT = pygame.event.Event(DEATH)
 
-    GRAVITY = 2
-
     GREEN = (0, 255, 0)
     YELLOW = (255, 255, 0)
     RED = (255, 0, 0)
@@ -69,9 +173,10 @@ class NPC:
 
     # Initialise NPC textures, rectangle and health
     def __init__(self, pos_x, pos_y, health, texture, inventory=None):
-        self.TEXTURE_IMG = pygame.image.load(os.path.join('assets', 'sprites', 'npc', texture)).convert_alpha()
-        self.TEXTURE_NORMAL = pygame.transform.scale(self.TEXTURE_IMG, (self.NPC_WIDTH, self.NPC_HEIGHT))
-        self.TEXTURE_FLIPPED = pygame.transform.flip(self.TEXTURE_NORMAL, True, False)
+        path = os.path.join('assets', 'sprites', 'npc', texture)
+        self.TEXTURE_IMG = TEXTURES.get(path)
+        self.TEXTURE_NORMAL = TEXTURES.get(path, (self.NPC_WIDTH, self.NPC_HEIGHT))
+        self.TEXTURE_FLIPPED = TEXTURES.get(path, (self.NPC_WIDTH, self.NPC_HEIGHT), flip=True)
         self.TEXTURE = self.TEXTURE_NORMAL
         self.rect = pygame.Rect(pos_x, pos_y, self.NPC_WIDTH, self.NPC_HEIGHT)
         self.HEALTH = health
@@ -79,17 +184,17 @@ class NPC:
         self.inventory = [] if inventory is None else inventory
 
     # Draw NPC to the window surface, and draw a health bar beneath it if health is lost
-    def draw(self, window):
-        self.update(window)
-        window.blit(self.TEXTURE, (self.rect.x, self.rect.y))
+    def draw(self, window, camera):
+        x, y = camera.project(self.rect)
+        window.blit(self.TEXTURE, (x, y))
         if self.HEALTH < self.MAX_HEALTH:
-            window.blit(self.HEALTH_BAR, (self.rect.x + self.rect.width / 2 - self.HEALTH_BAR.get_width() / 2,
-                                          self.rect.y + self.rect.height))
+            window.blit(self.HEALTH_BAR, (x + self.rect.width / 2 - self.HEALTH_BAR.get_width() / 2,
+                                          y + self.rect.height))
             percent = self.HEALTH / self.MAX_HEALTH
             ovl_width = self.HEALTH_OVERLAY
             new_width = round(ovl_width*percent)
-            ovl = pygame.Rect(self.rect.x + self.rect.width / 2 - self.HEALTH_OVERLAY / 2,
-                              self.rect.y + self.rect.height, new_width, 4)
+            ovl = pygame.Rect(x + self.rect.width / 2 - self.HEALTH_OVERLAY / 2,
+                              y + self.rect.height, new_width, 4)
             if percent < 0.35:
                 pygame.draw.rect(window, self.RED, ovl)
             elif percent < 0.65:
@@ -97,29 +202,15 @@ class NPC:
             elif percent < 1:
                 pygame.draw.rect(window, self.GREEN, ovl)
 
-    # Returns if gravity should be applied to the NPC
-    def apply_gravity(self, level):
-        if not self.check_collision(level, (self.rect.x, self.rect.y + self.GRAVITY)):
-            return True
-        return False
-
     # Check if the NPC is going to collide with a CollideType
     def check_collision(self, level, change):
         potential_rect = pygame.Rect(change[0], change[1], self.NPC_WIDTH, self.NPC_HEIGHT)
-        for level_object in level.level_objects:
-            if isinstance(level_object, CollideType):
-                if level_object.rect.colliderect(potential_rect):
-                    return True
-        return False
-
-    # Apply gravity
-    def handle_movement(self, level):
-        if self.apply_gravity(level):
-            self.rect.y += self.GRAVITY
+        return level.collides(potential_rect)
 
-    # Function to be called when NPC is drawn to apply movement rules
-    def update(self, window):
-        self.handle_movement(pygame.level)
+    # Function to be called every step of the game, dt seconds long, to apply movement rules
+    # NPCs which aren't updated every step are given the time of every step since their last update
+    def update(self, dt):
+        self.handle_movement(pygame.level, max(round(dt / self.STEP), 1))
 
     def change_health(self, amt):
         self.HEALTH += amt
@@ -135,8 +226,8 @@ class RobotEnemy(NPC):
     # Variables to be used to store if and how long the NPC is alerted
     alerted = False
     alerted_time = 0
-    ALERTED_IMAGE = pygame.image.load(os.path.join('assets', 'textures', 'npc', 'exclamation.png')).convert_alpha()
-    ALERTED_SOUND = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'npc', 'alert.mp3'))
+    ALERTED_IMAGE = Image(os.path.join('assets', 'textures', 'npc', 'exclamation.png'))
+    ALERTED_SOUND = Sound(os.path.join('assets', 'sounds', 'npc', 'alert.mp3'))
 
     # Dimensions of the 'range' rectangle centered around the NPC
     RADIUS_WIDTH, RADIUS_HEIGHT = 500, NPC.NPC_HEIGHT
@@ -154,8 +245,8 @@ class RobotEnemy(NPC):
 
     # Update the position of the 'range' rectangle if the NPC moves
     # If the player is in the rectangle, alert the NPC and start shooting
-    def update(self, window):
-        super().update(window)
+    def update(self, dt):
+        super().update(dt)
 
         # Update x and y position of the 'range' rectangle
         self.viewing_radius.x = self.rect.x - self.RADIUS_WIDTH / 2 + self.NPC_WIDTH / 2
@@ -176,11 +267,6 @@ class RobotEnemy(NPC):
             self.alerted = False
             self.alerted_time = 0
 
-        # While alerted, draw an exclamation above the NPC
-        if self.alerted_time > 0:
-            window.blit(self.ALERTED_IMAGE, (self.rect.x + self.rect.width / 2 - self.ALERTED_IMAGE.get_width() / 2,
-                                             self.rect.y - self.ALERTED_IMAGE.get_height()))
-
         # Once been alerted for more than one second, start shooting
         if self.alerted_time > 1:
             x = 0
@@ -190,14 +276,22 @@ class RobotEnemy(NPC):
             if self.FACING == self.RIGHT:
                 x = self.rect.x + self.rect.w
 
-            own_bullets = 0
-            for bullet in pygame.level.level_bullets:
-                if bullet.origin() == self:
-                    own_bullets += 1
-            if own_bullets < 3:
-                pygame.level.level_bullets.append(Bullet(x, y, self.FACING, self))
+            if pygame.level.level_bullets.owned(self) < 3:
+                pygame.level.level_bullets.fire(x, y, self.FACING, self)
                 self.alerted_time = 0
 
+        # Keep track of how long the NPC has been alerted for
+        if self.alerted:
+            self.alerted_time += dt
+
+    # While alerted, draw an exclamation above the NPC
+    def draw(self, window, camera):
+        super().draw(window, camera)
+        if self.alerted_time > 0:
+            x, y = camera.project(self.rect)
+            window.blit(self.ALERTED_IMAGE, (x + self.rect.width / 2 - self.ALERTED_IMAGE.get_width() / 2,
+                                             y - self.ALERTED_IMAGE.get_height()))
+
 
 class RobotBoss(RobotEnemy):
 
@@ -210,8 +304,8 @@ class RobotBoss(RobotEnemy):
         super().__init__(pos_x, pos_y, health, texture=self.texture, inventory=inventory)
         self.OFFSET = 50
 
-    def update(self, window):
-        super().update(window)
+    def update(self, dt):
+        super().update(dt)
 
         # Update x and y position of the 'range' rectangle
         self.viewing_radius.x = self.rect.x - self.RADIUS_WIDTH / 2 + self.NPC_WIDTH / 2
@@ -0,0 +1,38 @@
+# Something in a level which falls under gravity until it lands on a solid tile or CollideType object
+# Once a body lands it rests, and no collisions are checked for it until it is woken, either because
+# the object it rests on was removed, or because something moved it
+# Subclasses have a rect and a check_collision(level, position) function, which returns if the body would
+# collide with the level with its top left corner at the position
+class Body:
+
+    # Gravity moves the body down GRAVITY pixels every step of the game, which is STEP seconds long
+    GRAVITY = 2
+    STEP = 1 / 60
+
+    # Bodies start off falling, since they might have been placed in the air
+    resting = False
+
+    # Returns if gravity should be applied to the body
+    def apply_gravity(self, level):
+        if not self.check_collision(level, (self.rect.x, self.rect.y + self.GRAVITY)):
+            return True
+        return False
+
+    # Apply gravity for a number of steps, and rest once the body lands
+    def handle_movement(self, level, steps=1):
+        if self.resting:
+            return
+        for _ in range(steps):
+            if not self.apply_gravity(level):
+                self.rest(level)
+                return
+            self.rect.y += self.GRAVITY
+
+    # Stop checking for collisions, and let the level know what the body is resting on, so it can be woken
+    def rest(self, level):
+        self.resting = True
+        level.sleep(self)
+
+    # Start falling again, which must be called whenever something moves the body
+    def wake(self):
+        self.resting = False
@@ -0,0 +1,73 @@
+import pygame
+
+
+# Decides which NPCs in a level are updated each step, based on how far they are from the player
+# NPCs close to the player are active and updated every step, NPCs further away are nearby and only updated
+# every few steps, and every other NPC sleeps and isn't looked at until the player comes within range of it
+class NPCScheduler:
+
+    # How far, in pixels, an NPC can be from the centre of the player across and up or down to be active or nearby
+    # Active NPCs cover everything the camera can show, as the player is never more than 3/4 of the screen from an edge
+    ACTIVE_RANGE = 704, 512
+    NEARBY_RANGE = 1408, 1024
+
+    # How many steps pass between each update of a nearby NPC, and between each time the tiers are worked out again
+    NEARBY_INTERVAL = 4
+    REFRESH = 10
+
+    # NPCs which were in the active and nearby tiers the last time they were worked out, and how many steps
+    # have been scheduled since the level started, which is used to spread out the work done every few steps
+    active: list
+    nearby: list
+    tick: int
+
+    def __init__(self, level):
+        self.level = level
+        self.reset()
+
+    # Forget the tiers, so that they are worked out again on the next step, such as after the level has been reset
+    def reset(self):
+        self.active = []
+        self.nearby = []
+        self.tick = 0
+
+    # Stop updating an NPC which has been removed from the level
+    def remove(self, npc):
+        if npc in self.active:
+            self.active.remove(npc)
+        if npc in self.nearby:
+            self.nearby.remove(npc)
+
+    # Sort the NPCs within range of the player into the active and nearby tiers, leaving every other NPC asleep
+    # Only the NPCs in the cells around the player are looked at, so sleeping NPCs cost nothing
+    def refresh(self, player):
+        centre_x, centre_y = player.rect.center
+        active = pygame.Rect(0, 0, self.ACTIVE_RANGE[0] * 2, self.ACTIVE_RANGE[1] * 2)
+        nearby = pygame.Rect(0, 0, self.NEARBY_RANGE[0] * 2, self.NEARBY_RANGE[1] * 2)
+        active.center = nearby.center = centre_x, centre_y
+        self.active, self.nearby = [], []
+        for npc in self.level.npc_index.query(nearby):
+            if npc.rect.colliderect(active):
+                self.active.append(npc)
+            else:
+                self.nearby.append(npc)
+
+    # Update the NPCs which are due this step, dt seconds long, and move them in the level's index
+    # NPCs which were resting before they were updated can't have moved, so the index is left alone
+    # Nearby NPCs are given the time since they were last updated
+    def update(self, dt, player):
+        if self.tick % self.REFRESH == 0:
+            self.refresh(player)
+        index = self.level.npc_index
+        for npc in self.active:
+            moving = not npc.resting
+            npc.update(dt)
+            if moving:
+                index.move(npc)
+        if self.tick % self.NEARBY_INTERVAL == 0:
+            for npc in self.nearby:
+                moving = not npc.resting
+                npc.update(dt * self.NEARBY_INTERVAL)
+                if moving:
+                    index.move(npc)
+        self.tick += 1
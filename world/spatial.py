@@ -0,0 +1,81 @@
+# A uniform grid laid over the level which stores the objects overlapping each cell,
+# so that a query only looks at objects near a rectangle instead of every object in the level
+class SpatialHash:
+
+    # Size in pixels of each square cell
+    CELL_SIZE = 64
+
+    # Objects in each (column, row) cell, and the cells each object was inserted into
+    # The order objects were inserted in is also kept, so queries can return objects in the order they are drawn
+    cells: dict
+    positions: dict
+    order: dict
+    inserted: int
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.positions = {}
+        self.order = {}
+        self.inserted = 0
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, obj):
+        return obj in self.positions
+
+    # Returns the keys of every cell a rectangle overlaps
+    def cells_for(self, rect):
+        size = self.cell_size
+        return [(column, row)
+                for column in range(rect.x // size, (rect.x + max(rect.width, 1) - 1) // size + 1)
+                for row in range(rect.y // size, (rect.y + max(rect.height, 1) - 1) // size + 1)]
+
+    # Add an object to every cell its rectangle overlaps
+    def insert(self, obj):
+        keys = self.cells_for(obj.rect)
+        for key in keys:
+            self.cells.setdefault(key, []).append(obj)
+        self.positions[obj] = keys
+        if obj not in self.order:
+            self.order[obj] = self.inserted
+            self.inserted += 1
+
+    def remove(self, obj):
+        self.order.pop(obj, None)
+        for key in self.positions.pop(obj):
+            cell = self.cells[key]
+            cell.remove(obj)
+            if not cell:
+                del self.cells[key]
+
+    # Re-insert an object after its rectangle has moved, keeping its place in the order
+    def move(self, obj):
+        if self.positions.get(obj) != self.cells_for(obj.rect):
+            order = self.order[obj]
+            self.remove(obj)
+            self.insert(obj)
+            self.order[obj] = order
+
+    # Returns every object whose rectangle overlaps the given rectangle, each one only once
+    # If ordered is True, the objects are returned in the order they were inserted
+    def query(self, rect, ordered=False):
+        found = []
+        seen = set()
+        for key in self.cells_for(rect):
+            for obj in self.cells.get(key, ()):
+                if obj not in seen and obj.rect.colliderect(rect):
+                    seen.add(obj)
+                    found.append(obj)
+        if ordered:
+            found.sort(key=self.order.__getitem__)
+        return found
+
+    # Returns if any object's rectangle overlaps the given rectangle
+    def any(self, rect):
+        for key in self.cells_for(rect):
+            for obj in self.cells.get(key, ()):
+                if obj.rect.colliderect(rect):
+                    return True
+        return False
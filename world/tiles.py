@@ -0,0 +1,85 @@
+import os.path
+
+from engine.textures import TEXTURES
+from world.level_objects import ObjectType, CollideType, Background, Water, Wall, Air, Barrier, Grass, Dirt, DirtBkg, \
+    StairLeft, StairRight, Glass, Bush, Sand, Tree, Board, BuildingBkg1, BuildingBkg2
+
+# Every tile in a level's tile grid is the same size as an ObjectType
+TILE_SIZE = ObjectType.OBJECT_WIDTH
+
+
+# A kind of static tile, shared by every cell in a level's tile grid holding its id
+# A tile type is drawn as one or more ObjectType classes stacked on top of each other
+class TileType:
+
+    # The id stored in the tile grid, and the classes drawn in the cell from the bottom layer to the top
+    id: int
+    layers: tuple
+
+    # If the player, NPCs, items and bullets cannot pass through the tile
+    solid: bool
+
+    # The size of the area the tile is drawn over, which can be larger than the cell it is in
+    width: int
+    height: int
+
+    def __init__(self, tile_id, *layers):
+        self.id = tile_id
+        self.layers = layers
+        self.solid = any(issubclass(layer, CollideType) for layer in layers)
+        self.width = max(layer.SIZE[0] for layer in layers)
+        self.height = max(layer.SIZE[1] for layer in layers)
+        self.textures = None
+
+    # Returns the texture of every layer, loaded from the texture cache on first use
+    def get_textures(self):
+        if self.textures is None:
+            self.textures = [TEXTURES.get(os.path.join('assets', 'textures', 'tiles', layer.texture), layer.SIZE)
+                             for layer in self.layers]
+        return self.textures
+
+    # Draw the tile with its top left corner at a position on the surface
+    def draw(self, surface, position):
+        for texture in self.get_textures():
+            surface.blit(texture, position)
+
+
+# Table of every tile type, indexed by the id stored in the tile grid
+# An id of 0 is an empty cell
+TILE_TYPES: list = [None]
+
+
+# Add a tile type to the table and return it
+def register(*layers):
+    tile = TileType(len(TILE_TYPES), *layers)
+    TILE_TYPES.append(tile)
+    return tile
+
+
+BACKGROUND = register(Background)
+WATER = register(Water)
+WALL = register(Wall)
+AIR = register(Air)
+BARRIER = register(Barrier)
+GRASS = register(Grass)
+DIRT = register(Dirt)
+DIRT_BKG = register(DirtBkg)
+STAIR_LEFT = register(StairLeft)
+STAIR_RIGHT = register(StairRight)
+GLASS = register(Glass)
+BUSH = register(Bush)
+SAND = register(Sand)
+TREE = register(Tree)
+BOARD = register(Board)
+BUILDING_BKG_1 = register(BuildingBkg1, Wall)
+BUILDING_BKG_2 = register(BuildingBkg2, Wall)
+
+# A lookup table from tile id to 1 if the tile is solid, so collision checks are a single index
+SOLID_TILES = bytes(tile is not None and tile.solid for tile in TILE_TYPES)
+
+# A table from tile id to 1 if the tile is drawn larger than its cell, padded so bytes.translate can use it on a grid
+OVERSIZED_TILES = bytes(tile is not None and (tile.width > TILE_SIZE or tile.height > TILE_SIZE)
+                        for tile in TILE_TYPES).ljust(256, b'\0')
+
+# The furthest any tile is drawn past the right edge of its cell
+OVERHANG_X = max(tile.width for tile in TILE_TYPES[1:]) - TILE_SIZE